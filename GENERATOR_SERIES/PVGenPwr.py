@@ -1,5 +1,9 @@
 import numpy as np
 from scipy.optimize import root
+from scipy.interpolate import RegularGridInterpolator, RectBivariateSpline
+from pathlib import Path
+import hashlib
+import os
 
 """
     Calcula a potência máxima de geração fotovoltaica (MPPT).
@@ -107,7 +111,7 @@ def PVGenPwr(G: float, T: float, Np: int, Ns: int)-> tuple:
         def F(x):
             return f(v[0], x)
 
-        x = root(F, 0.0, method = method).x
+        x = root(F, 0.0, method = method).x[0]
         i[0] = x
         p[0] = v[0] * i[0]
 
@@ -116,7 +120,7 @@ def PVGenPwr(G: float, T: float, Np: int, Ns: int)-> tuple:
             def F(x):
                 return f(v[j], x)
 
-            x = root(F, 0.0, method = method).x
+            x = root(F, 0.0, method = method).x[0]
             i[j] = x
             p[j] = v[j] * i[j]
 
@@ -132,3 +136,139 @@ def PVGenPwr(G: float, T: float, Np: int, Ns: int)-> tuple:
         # Corrente correspondente a maior potência
         Impp = i[max_j]
     return (Pmpp, Vmpp, Impp)
+
+def PVGenPwr_batch(G: np.ndarray, T: np.ndarray, Np: int, Ns: int, n_iter: int = 100)-> tuple[np.ndarray]:
+    '''
+        Versão vetorizada de PVGenPwr: recebe arrays de irradiância G (W/m^2) e temperatura T (K), de mesmo formato (ou compatíveis por broadcast), e retorna (Pmpp, Vmpp, Impp) com esse formato, resolvendo todos os pontos de uma só vez.
+
+        No modelo f(V, I) de PVGenPwr, V e I aparecem somente na tensão do diodo de uma célula, u = V / Ns + (I / Np) * Rs, e f(V, I) = Np * g(u), com g decrescente:
+            g(u) = Iph - Is1 * (exp(u * q / (kB * T)) - 1) - Is2 * (exp(u * q / (A * kB * T)) - 1) - u / Rp
+        Logo todos os pontos da curva I-V têm u = u_oc, a raiz de g (circuito aberto, obtida por bisseção vetorizada), e I = Np * (u_oc - V / Ns) / Rs. A potência V * I é máxima em:
+            Vmpp = Ns * u_oc / 2, Impp = Np * u_oc / (2 * Rs), Pmpp = Np * Ns * u_oc ** 2 / (4 * Rs)
+        PVGenPwr obtém o mesmo ponto varrendo 1000 tensões entre 0 e Voc, portanto a diferença entre os dois é apenas a discretização da varredura.
+        Para G = 0 tem-se Pmpp = 0, Impp = 0 e Vmpp = NaN (None em PVGenPwr).
+    '''
+
+    kB = 1.380649e-23 # Constante de Boltzmann 
+    q = 1.60217663e-19 # Carga do elementar
+    # Parametros das células fotovoltaícas (os mesmos de PVGenPwr)
+    K0 = -5.729e-7
+    K1 = -0.1098
+    K2 = 44.5355
+    K3 = -1.264e4
+    K4 = 11.8003
+    K5 = -7.3174e3
+    K6 = 2.0000
+    K7 = 0.0000
+    K8 = 1.47
+    K9 = 1.6126e3
+    K10 = -4.474e-3
+    K11 = 2.303e6
+    K12 = -2.812e-2
+
+    G, T = np.broadcast_arrays(np.asarray(G, dtype = np.float64), np.asarray(T, dtype = np.float64))
+    on = G > 0 # Pontos com geração (G = 0 implica Iph = 0 e potência nula)
+    g_on = G[on]
+    t_on = T[on]
+
+    # Paramêtros do modelo de diodo
+    Iph = K0 * g_on * (1 + K1 * t_on) # Corrente 
+    Is1 = K2 * (t_on ** 3) * np.exp(K3 / t_on) # Corrente de saturação 1
+    Is2 = K4 * (t_on ** (3 / 2)) * np.exp(K5 / t_on) # Corrente de saturação 2
+    A = K6 + K7 * t_on # Fator de idealidade
+    Rp = K11 * np.exp(K12 * t_on) # Resistência em paralelo
+    Rs = K8 + (K9 / g_on) + (K10 * t_on) # Resistência em série
+    beta = q / (kB * t_on)
+
+    # Circuito aberto: g(u_oc) = 0, com g(0) = Iph > 0 e g(log(1 + Iph / Is1) / beta) <= 0
+    lo = np.zeros_like(Iph)
+    hi = np.log1p(Iph / Is1) / beta
+    for _ in range(n_iter):
+        u = 0.5 * (lo + hi)
+        g = Iph - Is1 * np.expm1(beta * u) - Is2 * np.expm1(beta * u / A) - u / Rp
+        lo = np.where(g > 0, u, lo)
+        hi = np.where(g > 0, hi, u)
+    u_oc = 0.5 * (lo + hi)
+
+    # Potência máxima, tensão e corrente correspondentes
+    Pmpp = np.zeros(G.shape)
+    Vmpp = np.full(G.shape, np.nan)
+    Impp = np.zeros(G.shape)
+    Pmpp[on] = Np * Ns * u_oc ** 2 / (4 * Rs)
+    Vmpp[on] = Ns * u_oc / 2
+    Impp[on] = Np * u_oc / (2 * Rs)
+
+    return (Pmpp, Vmpp, Impp)
+
+# Pasta das tabelas de potência pré-calculadas e tabelas já carregadas neste processo
+TABLES_PATH = Path(__file__).parent / 'PV_TABLES'
+_tables = {}
+
+# Grade padrão de irradiância (W/m^2) e temperatura (K), cobrindo as séries de DATA_BASE/solar_hourly_series.xlsx
+G_GRID = np.linspace(0.0, 1400.0, 141)
+T_GRID = np.linspace(263.15, 333.15, 71)
+
+def PVGenPwr_table(Np: int, Ns: int, G_grid: np.ndarray = G_GRID, T_grid: np.ndarray = T_GRID)-> np.ndarray:
+    '''
+        Tabela de Pmpp sobre a grade (G_grid, T_grid), shape (len(G_grid), len(T_grid)), calculada uma única vez com o modelo exato (PVGenPwr_batch) e gravada em PV_TABLES/*.npz, identificada por Np, Ns e pela grade.
+    '''
+
+    G_grid = np.asarray(G_grid, dtype = np.float64)
+    T_grid = np.asarray(T_grid, dtype = np.float64)
+    key = hashlib.sha1(G_grid.tobytes() + T_grid.tobytes()).hexdigest()[: 12]
+    file = TABLES_PATH / f'PVGenPwr_Np{Np}_Ns{Ns}_{key}.npz'
+
+    if file not in _tables:
+        if file.exists():
+            _tables[file] = np.load(file)['Pmpp']
+        else:
+            Pmpp, _, _ = PVGenPwr_batch(G_grid[:, None], T_grid[None, :], Np, Ns)
+            # Gravando em um arquivo temporário e renomeando, pois processos paralelos (ex.: uma aba solar por processo) podem calcular a mesma tabela
+            TABLES_PATH.mkdir(exist_ok = True)
+            temp = file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp, 'wb') as f:
+                np.savez(f, G_grid = G_grid, T_grid = T_grid, Pmpp = Pmpp)
+            os.replace(temp, file)
+            _tables[file] = Pmpp
+
+    return _tables[file]
+
+def PVGenPwr_surrogate(G: np.ndarray, T: np.ndarray, Np: int, Ns: int, method: str = 'cubic', G_grid: np.ndarray = G_GRID, T_grid: np.ndarray = T_GRID)-> np.ndarray:
+    '''
+        Pmpp aproximado por interpolação na tabela de PVGenPwr_table: method = 'linear' (bilinear) ou 'cubic' (bicúbica). Pontos fora da grade são calculados pelo modelo exato. Retorna Pmpp com o formato de G e T.
+    '''
+
+    table = PVGenPwr_table(Np, Ns, G_grid, T_grid)
+    G, T = np.broadcast_arrays(np.asarray(G, dtype = np.float64), np.asarray(T, dtype = np.float64))
+
+    inside = (G >= G_grid[0]) & (G <= G_grid[-1]) & (T >= T_grid[0]) & (T <= T_grid[-1])
+    Pmpp = np.zeros(G.shape)
+
+    if method == 'linear':
+        interpolator = RegularGridInterpolator((G_grid, T_grid), table)
+        Pmpp[inside] = interpolator(np.column_stack((G[inside], T[inside])))
+    elif method == 'cubic':
+        interpolator = RectBivariateSpline(G_grid, T_grid, table, kx = 3, ky = 3)
+        Pmpp[inside] = interpolator(G[inside], T[inside], grid = False)
+    else:
+        raise ValueError(f"Interpolação desconhecida: {method}. Utilize 'linear' ou 'cubic'.")
+
+    Pmpp[G <= 0] = 0.0 # Sem irradiância não há geração
+    Pmpp[~inside] = PVGenPwr_batch(G[~inside], T[~inside], Np, Ns)[0]
+
+    return Pmpp
+
+def PVGenPwr_surrogate_error(Np: int, Ns: int, method: str = 'cubic', G_grid: np.ndarray = G_GRID, T_grid: np.ndarray = T_GRID)-> tuple[float]:
+    '''
+        Erro máximo do substituto em relação ao modelo exato nos centros das células da grade, onde o erro de interpolação é maior. Retorna (erro absoluto máximo em W, erro máximo relativo à potência máxima da tabela).
+    '''
+
+    G_mid = (G_grid[: -1] + G_grid[1:]) / 2
+    T_mid = (T_grid[: -1] + T_grid[1:]) / 2
+    G, T = np.meshgrid(G_mid, T_mid, indexing = 'ij')
+
+    exact = PVGenPwr_batch(G, T, Np, Ns)[0]
+    approx = PVGenPwr_surrogate(G, T, Np, Ns, method, G_grid, T_grid)
+    error = np.max(np.abs(approx - exact))
+
+    return error, error / np.max(PVGenPwr_table(Np, Ns, G_grid, T_grid))
@@ -1,3 +1,5 @@
+import numpy as np
+
 def WTGenPwr(speed, cut_in_speed, cut_out_speed, nom_speed, nom_pwr, Nwtg):
     
     """
@@ -17,7 +19,7 @@ def WTGenPwr(speed, cut_in_speed, cut_out_speed, nom_speed, nom_pwr, Nwtg):
             [DOI: 10.1016/j.energy.2019.01.143](https://doi.org/10.1016/j.energy.2019.01.143
         
         Parâmetros:
-            speed (float): Velocidade do vento (em m/s).
+            speed (float | np.ndarray): Velocidade do vento (em m/s), um valor ou um array de velocidades de qualquer formato.
             cut_in_speed (float): Velocidade de corte-in da turbina (em m/s), abaixo da qual a turbina não gera potência.
             cut_out_speed (float): Velocidade de corte-out da turbina (em m/s), acima da qual a turbina para de gerar potência.
             nom_speed (float): Velocidade nominal da turbina (em m/s), onde a turbina atinge sua potência máxima.
@@ -25,16 +27,21 @@ def WTGenPwr(speed, cut_in_speed, cut_out_speed, nom_speed, nom_pwr, Nwtg):
             Nwtg (int): Número de turbinas eólicas no sistema.
         
         Retorna:
-            float: Potência total gerada pelo sistema de turbinas eólicas (em W).
+            float | np.ndarray: Potência total gerada pelo sistema de turbinas eólicas (em W), com o mesmo formato de speed.
     """
 
-    if speed < cut_in_speed:
-        Pwtg = 0
-    elif cut_in_speed <= speed < nom_speed:
-        Pwtg = nom_pwr * ((speed - cut_in_speed) / (nom_speed - cut_in_speed))**3
-    elif nom_speed <= speed < cut_out_speed:
-        Pwtg = nom_pwr
-    elif cut_out_speed <= speed:
-        Pwtg = 0    
+    speed = np.asarray(speed, dtype = np.float64)
+
+    # Curva de potência por trechos: abaixo do cut-in, rampa cúbica, nominal e acima do cut-out
+    conditions = [speed < cut_in_speed,
+                  (cut_in_speed <= speed) & (speed < nom_speed),
+                  (nom_speed <= speed) & (speed < cut_out_speed)]
+    choices = [0.0,
+               nom_pwr * ((speed - cut_in_speed) / (nom_speed - cut_in_speed))**3,
+               nom_pwr]
+    Pwtg = np.select(conditions, choices, default = 0.0) # cut_out_speed <= speed
+
+    if Pwtg.ndim == 0:
+        Pwtg = float(Pwtg) # Velocidade escalar, como na versão original
 
-    return Nwtg * Pwtg
\ No newline at end of file
+    return Nwtg * Pwtg
@@ -1,6 +1,11 @@
 import numpy as np
 from sklearn.neural_network import MLPRegressor
 from sklearn.metrics import mean_squared_error
+from pathlib import Path
+import hashlib
+import pickle
+import json
+import os
 
 """
     Função para construção de um modelo preditivo usando uma Rede Neural do tipo MLP (Multi-Layer Perceptron)
@@ -9,6 +14,12 @@ from sklearn.metrics import mean_squared_error
     Parãmetros:
         - Z: Lista ou vetor 1D com a série temporal.
         - p: Número de defasagens (lags) a serem usadas como entrada. Default: 2
+        - random_state: Semente da inicialização dos pesos da rede (None para uma semente derivada da série e do lag, de modo que chamadas sem semente reutilizam o modelo do cache)
+        - cache: Reutiliza o modelo treinado salvo em MLP_MODELS quando a série, o lag, os hiperparâmetros e a semente
+          são os mesmos (chave sha256), treinando somente quando o modelo não existe. Default: True
+
+    Cache de modelos (MLP_MODELS/<sha256>.pkl): limitado a MAX_CACHE_SIZE bytes, descartando os modelos usados há mais tempo (LRU pela data de modificação,
+    atualizada a cada reutilização).
 
     Retorno:
         - p: Lag utilizado
@@ -16,23 +27,51 @@ from sklearn.metrics import mean_squared_error
         - Y: Série original (a partir da posição p)
         - Yhat: Série predita pelo modelo
 """
-def generate_MLP(Z: list)-> tuple:
-
-    while True:
-        p = input('Insira o número de lags ou tecle enter para 2: ')
-        if p == '':
-            p = 2
-            break
-        try:
-            p = int(p)
-            if p > 0:
-                p = p
-                break
-            else:
-                print('Insira um valor numérico válido!')
-        except ValueError as v:
-            print(f'Insira um valor numérico válido! {v}')
 
+# Hiperparâmetros do MLPRegressor
+HYPERPARAMETERS = {'hidden_layer_sizes': (100, 100, 50),
+                   'solver': 'adam',
+                   'max_iter': 10000,
+                   'learning_rate': 'adaptive',
+                   'learning_rate_init': 0.01,
+                   'tol': 1e-4,
+                   'alpha': 1e-4}
+
+# Pasta do cache de modelos treinados e tamanho máximo do cache em bytes
+MODELS_PATH = Path(__file__).parent / 'MLP_MODELS'
+MAX_CACHE_SIZE = 100 * 2**20
+
+# Chave do modelo: sha256 da série, do lag, dos hiperparâmetros e da semente
+def _model_key(Z: np.ndarray, p: int, random_state: int)-> str:
+
+    digest = hashlib.sha256(Z.tobytes())
+    digest.update(json.dumps({'p': p, 'random_state': random_state, **HYPERPARAMETERS}, sort_keys = True).encode())
+
+    return digest.hexdigest()
+
+# Semente padrão: derivada do sha256 da série e do lag, portanto a mesma a cada chamada com a mesma série
+def _default_random_state(Z: np.ndarray, p: int)-> int:
+
+    digest = hashlib.sha256(Z.tobytes())
+    digest.update(str(p).encode())
+
+    return int.from_bytes(digest.digest()[:4], 'little') % 2**31
+
+# Descartando os modelos usados há mais tempo até o cache caber em max_size bytes
+def _evict_models(max_size: int = MAX_CACHE_SIZE)-> None:
+
+    files = sorted(MODELS_PATH.glob('*.pkl'), key = lambda file: file.stat().st_mtime)
+    size = sum(file.stat().st_size for file in files)
+
+    while files and size > max_size:
+        file = files.pop(0)
+        size -= file.stat().st_size
+        file.unlink(missing_ok = True)
+
+def generate_MLP(Z: list, p: int = 2, random_state: int = None, cache: bool = True)-> tuple:
+
+    # Série como vetor 1D (aceita também vetores coluna, shape (N, 1))
+    Z = np.asarray(Z, dtype = np.float64).reshape(-1)
     # Obtendo o tamanho do vetor Z
     N = len(Z)
     # Iniciando a matriz de entrada "X" e o vetor de saída "Y" que será utilizado no modelo a seguir
@@ -69,18 +108,34 @@ def generate_MLP(Z: list)-> tuple:
     Nota: O método 'adam' é particularmente eficaz em problemas de grande escala e variabilidade na escala dos gradientes.
     """
 
-    model = MLPRegressor(hidden_layer_sizes = (100, 100, 50),
-                        solver = 'adam',
-                        max_iter = 10000,
-                        learning_rate = 'adaptive',
-                        learning_rate_init = 0.01,
-                        tol = 1e-4,
-                        alpha = 1e-4
-                        # verbose = True
-                        )
-    
-    # treinando o modelo onde, X é a matriz de entrada e Y é a matriz de saída
-    model.fit(X, Y)
+    # Sem semente, uma semente determinística (uma semente aleatória nunca encontraria o modelo no cache)
+    random_state = _default_random_state(Z, p) if random_state is None else random_state
+
+    file = MODELS_PATH / f'{_model_key(Z, p, random_state)}.pkl'
+
+    if cache and file.exists():
+        # Reutilizando o modelo treinado e marcando-o como usado recentemente
+        with open(file, 'rb') as f:
+            model = pickle.load(f)
+        os.utime(file)
+    else:
+        model = MLPRegressor(**HYPERPARAMETERS,
+                            random_state = random_state
+                            # verbose = True
+                            )
+
+        # treinando o modelo onde, X é a matriz de entrada e Y é a matriz de saída
+        model.fit(X, Y)
+
+        if cache:
+            # Gravando em um arquivo temporário e renomeando, pois processos paralelos podem treinar o mesmo modelo
+            MODELS_PATH.mkdir(exist_ok = True)
+            temp = file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp, 'wb') as f:
+                pickle.dump(model, f)
+            os.replace(temp, file)
+            _evict_models()
+
     # obtendo a previsão 
     Yhat = model.predict(X)
     # performace do modelo
@@ -90,4 +145,46 @@ def generate_MLP(Z: list)-> tuple:
     print(f'O desempenho do modelo em termos de erro médio quadrático foi: {perf:.3f}')
     print(f'O ajuste geral do modelo aos dados usando o coeficiênte de determinação R² foi: {metric:.3f}')
 
-    return p, model, Y, Yhat
\ No newline at end of file
+    return p, model, Y, Yhat
+
+# Funções de ativação das camadas ocultas do MLPRegressor (a camada de saída é a identidade)
+ACTIVATIONS = {'relu': lambda z: np.maximum(z, 0.0),
+               'tanh': np.tanh,
+               'logistic': lambda z: 1.0 / (1.0 + np.exp(-z)),
+               'identity': lambda z: z}
+
+def recursive_forecast(models: list, history: np.ndarray, steps: int)-> np.ndarray:
+
+    """
+        Previsão recursiva de steps horas para várias séries de uma só vez, uma série por modelo (MLPs treinados com a mesma arquitetura e o mesmo lag p).
+        A cada passo a última previsão entra na janela de entrada, e o passo é um único forward pass em NumPy sobre os pesos empilhados (coefs_ e intercepts_),
+        sem a sobrecarga de um model.predict por série e por hora.
+
+        Parâmetros:
+            - models: Lista com os modelos MLP treinados (n_series,)
+            - history: Últimas p amostras de cada série, shape (n_series, p)
+            - steps: Quantidade de horas previstas
+
+        Retorno:
+            - forecast: Séries previstas, shape (n_series, steps)
+    """
+
+    # Pesos e bias de cada camada empilhados por modelo: W[j] shape (n_series, entradas, saídas) e b[j] shape (n_series, saídas)
+    W = [np.stack([model.coefs_[j] for model in models]) for j in range(len(models[0].coefs_))]
+    b = [np.stack([model.intercepts_[j] for model in models]) for j in range(len(models[0].intercepts_))]
+    activation = ACTIVATIONS[models[0].activation]
+
+    window = np.array(history, dtype = np.float64)
+    forecast = np.zeros((len(models), steps))
+
+    for t in range(steps):
+        h = window
+        for j in range(len(W)):
+            h = np.einsum('si,sio->so', h, W[j]) + b[j]
+            if j < len(W) - 1:
+                h = activation(h)
+        forecast[:, t] = h[:, 0]
+        # Deslocando a janela de entrada com a nova previsão
+        window = np.concatenate((window[:, 1:], h), axis = 1)
+
+    return forecast
@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from generate_MPLRegressor import generate_MLP
+from generate_MPLRegressor import generate_MLP, recursive_forecast
 
 """
     Script para geração de séries sintéticas de carga elétrica com base em dados históricos reais.
@@ -17,73 +17,71 @@ from generate_MPLRegressor import generate_MLP
 
     Para mais informações sobre análise de resíduos e validação de modelos, consulte:
     https://www.mathworks.com/help/econ/infer-residuals.html
+
+    Parâmetros de load_data:
+        - source: Arquivo de carga histórica, uma das chaves de LOAD_FILES ('Bandeira' ou 'Dafeira'). Default: 'Bandeira'
+        - p: Número de defasagens (lags) do modelo MLP. Default: 2
+        - n: Quantidade de séries (a primeira é a previsão e as demais cópias com ruído). Default: 11
+        - Npoints: Quantidade de horas de cada série. Default: 8760
+        - seed: Semente (ou Generator) do treinamento do MLP e do ruído das cópias. Com None o ruído é aleatório e o MLP usa a semente padrão de generate_MLP (derivada da série), reutilizando o modelo do cache
+
+    load_data_batch gera várias cargas de uma só vez (sources e seeds com um elemento por carga) e retorna shape (Nloads, n, Npoints).
+    Um MLP é treinado por carga e a extensão recursiva além do histórico avança todas as cargas juntas (recursive_forecast), um forward pass por hora.
+    O pipeline gera todas as cargas de um arquivo (load ou dload) em uma única chamada de load_data_batch, com a semente de cada carga derivada por SeedSequence.spawn.
 """
 
-def load_data():
-    # Caminho da base de dados
-    while True:
-        aux = int(input('Digite o valor 1 para o arquivo Bandeira ou 2 para o arquivo Dafeira: '))
-        if aux == 1:
-            path = Path(__file__).parent / 'DATA_BASE' / 'Bandeira_load.txt'
-            break
-        elif aux == 2:
-            path = Path(__file__).parent / 'DATA_BASE' / 'Dafeira_load.TXT'
-            break
-        else:
-            print('Favor inserir o valor 1 para o arquivo Bandeira ou 2 para o arquivo Dafeira!')
-
-    # Lê o arquivo de carga
-    load_table = pd.read_csv(path, delimiter='\t', header=None)
-    load_tsdata = load_table.to_numpy()
-
-    # Converte a série de 15 min para horária (média de 4 em 4 pontos)
-    hourly_tsdata = load_tsdata[::4]
-
-    # Geração do modelo de previsão usando MLP
-    p, mdl, Y, Yhat = generate_MLP(hourly_tsdata)
-
-    # Definindo o número de pontos de previsão
-    Npoints = 8760
-    T = len(hourly_tsdata)
-    pred_hourly_tsdata = np.zeros(Npoints)
-    pred_hourly_tsdata[:p] = hourly_tsdata[:p].flatten()
-
-    if Npoints < Yhat.shape[0]:
-        pred_hourly_tsdata[p: T] = Yhat[p: Npoints]
-    else:
-        pred_hourly_tsdata[p: T] = Yhat
-
-    t = T
-    # Geração recursiva da série além do histórico conhecido
-    while t < Npoints:
-        aux = np.array(pred_hourly_tsdata[t - p: t])
-        aux = aux.reshape(-1, p)
-        pred_hourly_tsdata[t] = mdl.predict(aux)[0]
-        t += 1
-
-    # Número de séries desejadas
-    while True:
-        n = input('Insira a quantidade de séries desejada ou tecle enter para 11: ')
-        if n == '':
-            n = 11
-            break
-        try:
-            n = int(n)
-            if n > 0:
-                break
-            else:
-                print("Insira um valor numérico válido!")
-        except ValueError:
-            print('Insira um valor numérico válido!')
+# Arquivos de carga histórica disponíveis (medições em intervalos de 15 min)
+LOAD_FILES = {'Bandeira': Path(__file__).parent / 'DATA_BASE' / 'Bandeira_load.txt',
+              'Dafeira': Path(__file__).parent / 'DATA_BASE' / 'Dafeira_load.TXT'}
+
+def load_data_batch(sources: list[str], p: int = 2, n: int = 11, Npoints: int = 8760, seeds: list = None)-> np.ndarray:
+
+    Nloads = len(sources)
+    seeds = [None] * Nloads if seeds is None else seeds
+
+    # Gerador aleatório da inicialização do MLP e do ruído das cópias de cada carga
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+
+    pred_hourly_tsdata = np.zeros((Nloads, Npoints))
+    models = []
+    T = np.zeros(Nloads, dtype = int)
+
+    for k, source in enumerate(sources):
+
+        # Lê o arquivo de carga
+        load_table = pd.read_csv(LOAD_FILES[source], delimiter='\t', header=None)
+        load_tsdata = load_table.to_numpy()
+
+        # Converte a série de 15 min para horária (média de 4 em 4 pontos)
+        hourly_tsdata = load_tsdata[::4].flatten()
+
+        # Geração do modelo de previsão usando MLP
+        random_state = None if seeds[k] is None else int(rngs[k].integers(2**31))
+        p, mdl, Y, Yhat = generate_MLP(hourly_tsdata, p, random_state = random_state)
+        models.append(mdl)
+
+        # Histórico: p primeiras amostras medidas e as demais ajustadas pelo modelo
+        T[k] = min(len(hourly_tsdata), Npoints)
+        pred_hourly_tsdata[k, :p] = hourly_tsdata[:p]
+        pred_hourly_tsdata[k, p: T[k]] = Yhat[: T[k] - p]
+
+    # Geração recursiva das séries além do histórico conhecido, todas as cargas juntas
+    steps = Npoints - np.min(T)
+    if steps > 0:
+        history = np.stack([pred_hourly_tsdata[k, T[k] - p: T[k]] for k in range(Nloads)])
+        forecast = recursive_forecast(models, history, steps)
+        for k in range(Nloads):
+            pred_hourly_tsdata[k, T[k]:] = forecast[k, : Npoints - T[k]]
 
     # Adicionando ruído para gerar séries distintas
-    pred_hourly_tsdata = pred_hourly_tsdata.flatten()
-    load_hourly_tsdata = np.zeros((n, Npoints))
-    load_hourly_tsdata[0, :] = pred_hourly_tsdata
+    load_hourly_tsdata = np.zeros((Nloads, n, Npoints))
+    load_hourly_tsdata[:, 0, :] = pred_hourly_tsdata
 
-    for i in range(1, n):
-        delta = 0.05 * pred_hourly_tsdata * np.random.randn(Npoints)
-        load_hourly_tsdata[i, :] = pred_hourly_tsdata + delta
+    # Um sorteio (n - 1, Npoints) por carga, na mesma sequência do gerador de cada carga
+    noise = np.empty((Nloads, n - 1, Npoints))
+    for k in range(Nloads):
+        rngs[k].standard_normal(out = noise[k])
+    load_hourly_tsdata[:, 1:, :] = pred_hourly_tsdata[:, None, :] + 0.05 * pred_hourly_tsdata[:, None, :] * noise
 
     # Convertendo para potência aparente trifásica (VA) com base em tensão de 13,8 kV
     S_base = np.sqrt(3) * 13.8e3
@@ -91,31 +89,17 @@ def load_data():
 
     return load_hourly_tsdata
 
+def load_data(source: str = 'Bandeira', p: int = 2, n: int = 11, Npoints: int = 8760, seed: int| np.random.Generator = None)-> np.ndarray:
+    return load_data_batch([source], p, n, Npoints, [seed])[0]
+
 # Execução principal
 if __name__ == '__main__':
 
-    # Quantidade de cargas a serem geradas
-    while True:
-        N = input('Digite a quantidade de cargas desejadas ou tecle enter para 3: ')
-        if N == '':
-            N = 3
-            break
-        try:
-            N = int(N)
-            if N > 0:
-                break
-            else:
-                print('Insira um valor numérico válido!')
-        except ValueError as v:
-            print(f'Insira um valor numérico válido.\nERRO: {v}')
-
-    save_path = Path(__file__).parent.parent / 'GENERATED_SERIES' / 'dload_hourly_series.xlsx'
-
-    with pd.ExcelWriter(save_path) as writer:
-        for i in range(N):
-            load_hourly_tsdata = load_data()
-            load_hourly_tsdata = load_hourly_tsdata / np.max(load_hourly_tsdata, axis = 1, keepdims = True)
-            load_hourly_series_df = pd.DataFrame(load_hourly_tsdata)
-            load_hourly_series_df.to_excel(writer, sheet_name=f'Carga {i + 1}', header=None, index=False)
+    from pipeline import run_pipeline, CONFIG
+    import os
+
+    # Arquivo de origem de cada carga despachável definido em pipeline.CONFIG['dload'], uma carga por processo
+    save_path = run_pipeline(CONFIG, n_workers = os.cpu_count(), artifacts = ['dload'])['dload']
+    print(f'Séries exportadas em {save_path}')
 
     print('FIM')
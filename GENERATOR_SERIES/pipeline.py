@@ -0,0 +1,176 @@
+from wind_data_generator import wind_data_generation, REGIONS, TURBINE
+from solar_data_generator import solar_data_generation, SHEETS
+from load_data_generator import load_data_batch
+from pld_data_generator import pld_data_generation
+from tdist_data_generator import tdist_series
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pandas as pd
+import numpy as np
+import json
+
+'''
+    Este script tem a finalidade de regenerar, sem interação com o usuário, todas as séries de GENERATED_SERIES a partir de um dicionário de configuração (CONFIG ou um arquivo .json com as mesmas chaves).
+
+    - Cada aba de cada arquivo (uma região eólica, uma localidade solar, ...) é uma tarefa independente, de modo que as tarefas podem ser distribuídas entre processos (n_workers). As cargas de um arquivo (load ou dload) formam uma única tarefa (load_data_batch), cujo resultado tem uma linha por aba, pois a extensão recursiva avança todas as cargas juntas;
+    - O processo principal reúne os arrays (generate_series) e grava cada arquivo uma única vez (run_pipeline), .xlsx com uma aba por tarefa ou .csv;
+    - Cada aba estocástica recebe um fluxo aleatório independente, np.random.SeedSequence(seed, spawn_key = (posição do arquivo em ARTIFACTS,)).spawn(abas)[i], que não depende da quantidade de processos nem dos demais arquivos selecionados. Portanto, a mesma configuração reproduz os mesmos arrays, bit a bit, com qualquer n_workers;
+    - Junto a cada arquivo é gravado o .npy do armazenamento binário de séries (VPP_DISPATCH_MILP/series_store), shape (abas, anos, horas), portanto o despacho lê as séries regeneradas sem converter as planilhas. O .csv da tarifa contém somente a primeira distribuidora.
+
+    - Configuração (chaves de CONFIG):
+        - seed: Semente base das séries estocásticas;
+        - wind: Usinas eólicas, regiões de wind_data_generator.REGIONS e parâmetros da turbina (TURBINE);
+        - solar: Usinas FVs, abas de solar_data_generator.SHEETS, Np, Ns e modelo de potência (surrogate);
+        - load e dload: Cargas NÃO despacháveis e despacháveis, arquivo de origem de cada carga (load_data_generator.LOAD_FILES), lags (p) e quantidade de séries (n);
+        - pld e tdist: PLD e tarifas das distribuidoras de tdist_data_generator.TARIFFS (years: anos do calendário de fins de semana e feriados, None para uma linha sem calendário);
+        - file: Nome do arquivo gerado em GENERATED_SERIES.
+
+    - Parâmetros de entrada de run_pipeline (config: dict, n_workers: int, artifacts: list):
+        - config: Dicionário de configuração;
+        - n_workers: Quantidade de processos (1 para execução serial no processo principal);
+        - artifacts: Arquivos a regenerar, ex.: ['wind', 'solar'] (None para todos);
+
+    - Retorna um dicionário com o caminho de cada arquivo gerado.
+'''
+
+# Pasta das séries geradas
+path = Path(__file__).parent.parent / 'GENERATED_SERIES'
+
+# Configuração padrão, reproduzindo os arquivos de GENERATED_SERIES
+CONFIG = {'seed': 1,
+          'wind': {'file': 'WTGsystem_hourly_series.xlsx', 'regions': ['Volta Redonda', 'Campos dos Goytacazes'], 'Npoints': 8760, 'n': 11, 'turbine': TURBINE},
+          'solar': {'file': 'PVsystem_hourly_series.xlsx', 'sheets': SHEETS, 'Npoints': 168, 'n': 11, 'Np': 400, 'Ns': 2000, 'surrogate': False},
+          'load': {'file': 'load_hourly_series.xlsx', 'sources': ['Bandeira', 'Bandeira', 'Bandeira'], 'p': 2, 'n': 11, 'Npoints': 8760},
+          'dload': {'file': 'dload_hourly_series.xlsx', 'sources': ['Bandeira', 'Bandeira'], 'p': 2, 'n': 11, 'Npoints': 8760},
+          'pld': {'file': 'PLD_hourly_series.csv', 'Npoints': 8760},
+          'tdist': {'file': 'TDist_hourly_series.csv', 'years': None}}
+
+# Configuração a partir de um arquivo .json, completada com CONFIG nas chaves ausentes
+def load_config(config_path: Path)-> dict:
+
+    with open(config_path, 'r', encoding = 'utf-8') as file:
+        user_config = json.load(file)
+
+    config = {key: (dict(value) if isinstance(value, dict) else value) for key, value in CONFIG.items()}
+    for key, value in user_config.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+
+    return config
+
+# Arquivos gerados pelo pipeline (a posição identifica o fluxo aleatório de cada arquivo)
+ARTIFACTS = ['wind', 'solar', 'load', 'dload', 'pld', 'tdist']
+
+# Tarefas (arquivo, aba, função, argumentos, normalizar) definidas pela configuração
+# Com uma lista de abas, a função retorna uma série por aba no primeiro eixo
+def pipeline_tasks(config: dict, artifacts: list = None)-> list[tuple]:
+
+    artifacts = [key for key in ARTIFACTS if key in config] if artifacts is None else artifacts
+    tasks = []
+
+    for artifact in artifacts:
+        if artifact not in ARTIFACTS:
+            raise ValueError(f'Série desconhecida: {artifact}')
+
+        cfg = config[artifact]
+        # Semente do arquivo, da qual são derivados os fluxos independentes de cada aba
+        root = np.random.SeedSequence(config['seed'], spawn_key = (ARTIFACTS.index(artifact),))
+
+        if artifact == 'wind':
+            for region, seed in zip(cfg['regions'], root.spawn(len(cfg['regions']))):
+                kwargs = dict(REGIONS[region], Npoints = cfg['Npoints'], n = cfg['n'], seed = seed, **cfg['turbine'])
+                tasks.append((artifact, region, wind_data_generation, kwargs, True))
+
+        elif artifact == 'solar':
+            for sheet in cfg['sheets']:
+                kwargs = dict(sheet = sheet, Npoints = cfg['Npoints'], n = cfg['n'], Np = cfg['Np'], Ns = cfg['Ns'], surrogate = cfg['surrogate'])
+                tasks.append((artifact, sheet, solar_data_generation, kwargs, False))
+
+        elif artifact in ['load', 'dload']:
+            sheets = [f'Carga {i + 1}' for i in range(len(cfg['sources']))]
+            kwargs = dict(sources = cfg['sources'], p = cfg['p'], n = cfg['n'], Npoints = cfg['Npoints'], seeds = root.spawn(len(cfg['sources'])))
+            tasks.append((artifact, sheets, load_data_batch, kwargs, True))
+
+        elif artifact == 'pld':
+            tasks.append((artifact, None, pld_data_generation, dict(Npoints = cfg['Npoints']), False))
+
+        elif artifact == 'tdist':
+            tasks.append((artifact, None, tdist_series, dict(years = cfg['years']), False))
+
+    return tasks
+
+# Execução de uma tarefa (em um processo do pool ou no processo principal)
+def _run_task(function, kwargs: dict, normalize: bool)-> np.ndarray:
+
+    series = function(**kwargs)
+    if normalize:
+        series = series / np.max(series, axis = -1, keepdims = True) # Normalizando cada série pelo seu valor de pico
+
+    return series
+
+# Séries de cada arquivo, lista de (aba, array) na ordem da configuração
+def generate_series(config: dict = CONFIG, n_workers: int = 1, artifacts: list = None)-> dict[str, list[tuple]]:
+
+    tasks = pipeline_tasks(config, artifacts)
+    functions = [function for artifact, sheet, function, kwargs, normalize in tasks]
+    arguments = [kwargs for artifact, sheet, function, kwargs, normalize in tasks]
+    normalizes = [normalize for artifact, sheet, function, kwargs, normalize in tasks]
+
+    # Calculando as séries, em paralelo caso solicitado, na mesma ordem das tarefas
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers = n_workers) as pool:
+            results = list(pool.map(_run_task, functions, arguments, normalizes))
+    else:
+        results = list(map(_run_task, functions, arguments, normalizes))
+
+    # Reunindo as abas de cada arquivo
+    outputs = {}
+    for (artifact, sheet, function, kwargs, normalize), series in zip(tasks, results):
+        if isinstance(sheet, list):
+            outputs.setdefault(artifact, []).extend(zip(sheet, series))
+        else:
+            outputs.setdefault(artifact, []).append((sheet, series))
+
+    return outputs
+
+def run_pipeline(config: dict = CONFIG, n_workers: int = 1, artifacts: list = None)-> dict[str, Path]:
+
+    outputs = generate_series(config, n_workers, artifacts)
+
+    # Gravando cada arquivo uma única vez, junto ao .npy do armazenamento binário de séries
+    paths = {}
+    for artifact, sheets in outputs.items():
+        save_path = path / config[artifact]['file']
+
+        if save_path.suffix == '.xlsx':
+            series = np.stack([series for sheet, series in sheets])
+            with pd.ExcelWriter(save_path) as writer:
+                for sheet, series_sheet in sheets:
+                    pd.DataFrame(series_sheet).to_excel(writer, sheet_name = sheet, header = None, index = False)
+        else:
+            series = sheets[0][1]
+            series = series if series.ndim == 3 else series[None, :, :]
+            pd.DataFrame(series[0]).to_csv(save_path, sep = ';', header = None, index = False)
+
+        np.save(save_path.with_suffix('.npy'), series)
+        paths[artifact] = save_path
+
+    return paths
+
+# Exemplo de uso: python pipeline.py [config.json]
+if __name__ == '__main__':
+
+    import sys
+    import os
+    import time
+
+    config = load_config(sys.argv[1]) if len(sys.argv) > 1 else CONFIG
+
+    start_time = time.time()
+    paths = run_pipeline(config, n_workers = os.cpu_count())
+
+    for artifact, save_path in paths.items():
+        print(f'{artifact}: {save_path.name}')
+    print(f'Séries regeneradas em {time.time() - start_time:.1f} s')
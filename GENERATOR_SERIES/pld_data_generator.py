@@ -18,46 +18,73 @@ from pathlib import Path
 path = Path(__file__).parent / 'DATA_BASE' 
 path_PLD = path / 'Historico_do_Preco_Horario(SE)_-_17_de_abril_de_2018_a_5_de_abril_de_2022.xlsx'
 
-# Importando a tabela PLD e convertendo em séries históricas
-PLD_Table = pd.read_excel(path_PLD, skiprows = 1)
+def fill_gaps(series: np.ndarray)-> np.ndarray:
 
-# Obtendo os dados das 24 linhas(horas) e das 1437 colunas e atribuindo na váriavel Daily_PLD
-Daily_PLD = PLD_Table.iloc[1: 25, 2:] # Período de 24 horas
+    """
+        Interpolação linear vetorizada das lacunas (NaN) de cada linha de series, shape (linhas, horas), repetindo o valor válido mais próximo nas bordas
+        (equivalente a pd.DataFrame(series).interpolate(axis = 1, limit_direction = 'both')).
+    """
 
-# Obtendo as dimensões da matriz M = 24 linhas e N = 1437 colunas
-M, N = Daily_PLD.shape
+    rows, Npoints = series.shape
+    valid = ~np.isnan(series)
+    hours = np.broadcast_to(np.arange(Npoints), series.shape)
 
-# Transformando os dados obtidos acima em vetor coluna(série temporal)
-PLD_daily_tsdata = Daily_PLD.values.reshape((M * N, 1)) 
-# Obtendo o tamanho da série temporal por ano
-len_pld_timeseries = len(PLD_daily_tsdata) # 345122
-# Variável com a quantidades de horas em um ano 24h x 365 = 8760h
-Npoints = 8760
-# Obtendo a quantidade de cenários(anos) em um número inteiro
-Nscenarios = len_pld_timeseries // Npoints
-# Criando uma matriz preenchida com zeros com dimenões Ncenários x Npoints
-PLD_hourly_series = np.zeros((Nscenarios, Npoints))
+    # Índice do valor válido anterior e do seguinte de cada hora
+    previous = np.maximum.accumulate(np.where(valid, hours, -1), axis = 1)
+    following = np.minimum.accumulate(np.where(valid, hours, Npoints)[:, ::-1], axis = 1)[:, ::-1]
 
-for s in range(Nscenarios):
-    inicio = Npoints * s
-    fim = Npoints * (s + 1)
-    PLD_hourly_series [s, :] = PLD_daily_tsdata[inicio: fim].flatten()
+    # Nas bordas, repetindo o valor válido mais próximo
+    previous, following = np.where(previous < 0, following, previous), np.where(following >= Npoints, previous, following)
+    previous, following = np.clip(previous, 0, Npoints - 1), np.clip(following, 0, Npoints - 1) # Linhas sem nenhum valor válido permanecem NaN
 
-PLD_hourly_series = pd.DataFrame(PLD_hourly_series).interpolate(axis=1, limit_direction='both').to_numpy()
+    r = np.arange(rows)[:, None]
+    y0, y1 = series[r, previous], series[r, following]
+    weight = (hours - previous) / np.maximum(following - previous, 1)
 
-# Salvar o DataFrame em um arquivo CSV, Excel ou outro formato
-PLD_hourly_df = pd.DataFrame(PLD_hourly_series)
-path = Path(__file__).parent.parent / 'GENERATED_SERIES' / 'PLD_hourly_series.csv'
-PLD_hourly_df.to_csv(path, index = False, sep = ';', header = None)
+    return np.where(valid, series, y0 + weight * (y1 - y0))
 
-print("Valor da célula problemática:")
-print(PLD_hourly_series[0, 189])  # coluna 189 da linha 1
+def pld_data_generation(path_PLD: Path = path_PLD, Npoints: int = 8760)-> np.ndarray:
+
+    """
+        Organiza o histórico horário de PLD em cenários anuais de Npoints horas, shape (Nscenarios, Npoints), com as lacunas interpoladas.
+    """
+
+    # Importando a tabela PLD e convertendo em séries históricas
+    PLD_Table = pd.read_excel(path_PLD, skiprows = 1)
+
+    # Obtendo os dados das 24 linhas(horas) e das 1437 colunas e atribuindo na váriavel Daily_PLD
+    Daily_PLD = PLD_Table.iloc[1: 25, 2:] # Período de 24 horas
+
+    # Obtendo as dimensões da matriz M = 24 linhas e N = 1437 colunas
+    M, N = Daily_PLD.shape
+
+    # Transformando os dados obtidos acima em uma série temporal e organizando-a em cenários(anos) de Npoints horas com um único reshape
+    PLD_daily_tsdata = np.asarray(Daily_PLD.values, dtype = np.float64).reshape(M * N)
+    # Obtendo a quantidade de cenários(anos) em um número inteiro
+    Nscenarios = len(PLD_daily_tsdata) // Npoints
+    PLD_hourly_series = PLD_daily_tsdata[: Nscenarios * Npoints].reshape((Nscenarios, Npoints))
+
+    # Preenchendo as lacunas por interpolação linear em cada cenário
+    PLD_hourly_series = fill_gaps(PLD_hourly_series)
+
+    return PLD_hourly_series
 
 # Visualização da série de PLD
 if __name__ == '__main__':
 
     import matplotlib.pyplot as plt
 
+    PLD_hourly_series = pld_data_generation()
+
+    # Salvar o DataFrame em um arquivo CSV, Excel ou outro formato
+    PLD_hourly_df = pd.DataFrame(PLD_hourly_series)
+    save_path = Path(__file__).parent.parent / 'GENERATED_SERIES' / 'PLD_hourly_series.csv'
+    PLD_hourly_df.to_csv(save_path, index = False, sep = ';', header = None)
+    np.save(save_path.with_suffix('.npy'), PLD_hourly_series[None, :, :]) # Armazenamento binário de séries, shape (abas, anos, horas)
+
+    print("Valor da célula problemática:")
+    print(PLD_hourly_series[0, 189])  # coluna 189 da linha 1
+
     for i in range(PLD_hourly_series.shape[0]):
 
         plt.plot(PLD_hourly_series[i, :24])
@@ -2,10 +2,11 @@ import numpy as np
 
 """
     Script para geração da série horária de tarifas de energia da distribuidora (TDist).
-    
+
     Premissas:
     - Tarifas com periodização horária (tarifa branca)
-    - Considera dias úteis apenas (sem diferenciação para finais de semana ou feriados)
+    - Sem calendário (years = None), considera dias úteis apenas (sem diferenciação para finais de semana ou feriados)
+    - Com calendário (years), sábados, domingos e feriados (HOLIDAYS) são inteiramente Fora de Ponta
     - Horários definidos conforme padrão da Enel (março de 2021):
         - Ponta: 18h00 às 20h59
         - Intermediário: 16h00 às 17h59 e 21h00 às 21h59
@@ -14,51 +15,60 @@ import numpy as np
         - Ponta: R$1,33333/kWh
         - Intermediária: R$0,88020/kWh
         - Fora de Ponta: R$0,57060/kWh
-    
+
     Fonte: https://www.reclameaqui.com.br/enel-distribuicao-rio/tarifa-branca_tXRUzcJG6p-KOBAL/
+
+    A tarifa de cada hora é obtida por um mapeamento vetorizado hora do dia -> posto tarifário -> valor (bands e prices de TARIFFS), de modo que
+    várias distribuidoras e vários anos são gerados em uma única chamada de tdist_series, shape (distribuidoras, anos, horas), o mesmo formato
+    do armazenamento binário de séries (VPP_DISPATCH_MILP/series_store).
 """
 
+# Postos tarifários: 0 Fora de Ponta, 1 Intermediário, 2 Ponta
+FORA_PONTA, INTERMEDIARIO, PONTA = 0, 1, 2
+
+# Estruturas tarifárias por distribuidora: posto de cada hora do dia (bands, shape (24,)) e valor de cada posto em R$/kWh (prices)
+TARIFFS = {'Enel': {'bands': np.array([FORA_PONTA] * 16 + [INTERMEDIARIO] * 2 + [PONTA] * 3 + [INTERMEDIARIO] + [FORA_PONTA] * 2),
+                    'prices': np.array([0.57060, 0.88020, 1.33333])}}
+
+# Feriados nacionais de data fixa (MM-DD); os móveis (Carnaval, Sexta-feira Santa, Corpus Christi) podem ser informados em holidays como 'AAAA-MM-DD'
+HOLIDAYS = ['01-01', '04-21', '05-01', '09-07', '10-12', '11-02', '11-15', '12-25']
+
+def tdist_series(tariffs: dict = None, years: list = None, Npoints: int = 8760, holidays: list = HOLIDAYS)-> np.ndarray:
+    """
+    Gera as séries horárias de tarifas das distribuidoras de tariffs (None para TARIFFS), uma linha por ano de years, shape (distribuidoras, anos, Npoints).
+    Com years = None é gerada uma única linha sem calendário (todos os dias úteis).
+    """
+    tariffs = TARIFFS if tariffs is None else tariffs
+
+    # Tarifa de cada hora do dia por distribuidora, shape (distribuidoras, 24)
+    daily = np.stack([np.asarray(tariff['prices'])[np.asarray(tariff['bands'])] for tariff in tariffs.values()])
+    off_peak = np.array([np.asarray(tariff['prices'])[FORA_PONTA] for tariff in tariffs.values()])
+
+    hours = np.arange(Npoints)
+    hourly = daily[:, hours % 24] # shape (distribuidoras, Npoints)
+
+    if years is None:
+        return hourly[:, None, :]
+
+    # Dias úteis de cada ano, shape (anos, Npoints)
+    days = np.array([np.datetime64(f'{year}-01-01') + hours // 24 for year in years])
+    dates = [f'{year}-{day}' if len(day) == 5 else day for year in years for day in holidays]
+    business = np.is_busday(days.astype('datetime64[D]'), holidays = dates)
+
+    return np.where(business[None, :, :], hourly[:, None, :], off_peak[:, None, None])
+
 def tdist_generator():
     """
     Gera uma série horária de tarifas da distribuidora (TDist) para um ano inteiro (8760 horas).
     """
-    horas_ano = 8760  # Total de horas em um ano (365 dias x 24h)
-    
-    # Inicializa vetor de zeros para armazenar as tarifas por hora
-    TDist_hourly_series = np.zeros(horas_ano)
-
-    # Valores das tarifas (em R$/kWh)
-    PONTA = 1.33333
-    INTERMEDIARIA = 0.88020
-    FORA_PONTA = 0.57060
-
-    # Loop ao longo de cada hora do ano
-    for t in range(horas_ano):
-        h = t % 24  # Determina a hora do dia (0 a 23), com base no índice t
-
-        # Define a tarifa de acordo com o horário
-        if 0 <= h < 16:
-            tarifa = FORA_PONTA
-        elif 16 <= h < 18:
-            tarifa = INTERMEDIARIA
-        elif 18 <= h < 21:
-            tarifa = PONTA
-        elif 21 <= h < 22:
-            tarifa = INTERMEDIARIA
-        else:
-            tarifa = FORA_PONTA
-
-        # Armazena o valor da tarifa no vetor
-        TDist_hourly_series[t] = tarifa
-
     # Retorna o vetor como matriz de 1 linha e 8760 colunas
-    return TDist_hourly_series.reshape((1, horas_ano))
-
+    return tdist_series({'Enel': TARIFFS['Enel']})[0]
 
 # Executa a função principal quando o script for executado diretamente
 if __name__ == '__main__':
     from pathlib import Path
     import pandas as pd
+    import time
 
     # Define o caminho do arquivo de saída na pasta 'GENERATED_SERIES'
     save_path = (Path(__file__).parent.parent / 'GENERATED_SERIES' / 'TDist_hourly_series.csv').resolve()
@@ -68,5 +78,11 @@ if __name__ == '__main__':
 
     # Salva a série como arquivo CSV (valores separados por ponto e vírgula, sem cabeçalho ou índice)
     pd.DataFrame(TDist_hourly_series).to_csv(save_path, sep=';', index=False, header=False)
+    np.save(save_path.with_suffix('.npy'), TDist_hourly_series[None, :, :]) # Armazenamento binário de séries, shape (abas, anos, horas)
 
     print('Série horária de tarifas salva com sucesso.')
+
+    # Exemplo: 11 anos (2013 a 2023) com calendário de fins de semana e feriados
+    start_time = time.perf_counter()
+    series = tdist_series(years = range(2013, 2024))
+    print(f'Séries {series.shape} geradas em {(time.perf_counter() - start_time) * 1e3:.2f} ms')
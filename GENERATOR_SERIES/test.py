@@ -0,0 +1,29 @@
+from PVGenPwr import PVGenPwr, PVGenPwr_batch
+import numpy as np
+
+'''
+    Testes de regressão das versões vetorizadas dos modelos de geração em relação às versões escalares de referência.
+
+    - Execução: python -m pytest GENERATOR_SERIES/test.py
+'''
+
+# MPP em forma fechada (PVGenPwr_batch) igual ao MPP da varredura de tensões de PVGenPwr
+def test_PVGenPwr_batch():
+
+    Np, Ns = 400, 2000
+    G = np.array([[150.0, 600.0], [1000.0, 0.0]]) # Irradiância (W/m^2), incluindo um ponto sem geração
+    T = np.array([[283.15, 298.15], [318.15, 298.15]]) # Temperatura (K)
+
+    Pmpp, Vmpp, Impp = PVGenPwr_batch(G, T, Np, Ns)
+    assert Pmpp.shape == Vmpp.shape == Impp.shape == G.shape
+
+    for g, t, P, V, I in zip(G.ravel(), T.ravel(), Pmpp.ravel(), Vmpp.ravel(), Impp.ravel()):
+        P_ref, V_ref, I_ref = PVGenPwr(g, t, Np, Ns)
+        if g == 0:
+            assert P == 0 and I == 0 and np.isnan(V)
+        else:
+            # A diferença é somente a discretização da varredura de 1000 tensões de PVGenPwr
+            np.testing.assert_allclose(P, P_ref, rtol = 1e-5)
+            np.testing.assert_allclose(V, V_ref, rtol = 1e-2)
+            np.testing.assert_allclose(I, I_ref, rtol = 1e-2)
+            assert P >= P_ref * (1 - 1e-12) # O MPP exato não é menor que o melhor ponto da varredura
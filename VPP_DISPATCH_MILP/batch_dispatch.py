@@ -0,0 +1,116 @@
+from generator_scenarios import apply_scenario
+from decompose_vetor import decompose
+from vpp_layout import VARIABLES
+from optimazer_GA import solver
+from optimazer_MILP import solver_milp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+
+'''
+    Este script tem a finalidade de despachar uma lista de cenários da VPP, cada um de forma independente, distribuindo as otimizações entre processos e gravando os resultados em disco à medida que cada cenário termina.
+
+    - Parâmetros de entrada (scenarios: list[dict], data: dict, out_dir: Path, method: str, n_workers: int, seed: int, delta: float):
+        - scenarios: Lista de cenários, ex.: import_scenarios_from_pickle ou create_scenarios;
+        - data: Dicionário contendo os parâmetros iniciais da VPP (inclusive Nt);
+        - out_dir: Pasta onde os resultados serão gravados;
+        - method: Otimizador utilizado, 'GA' (optimazer_GA.solver) ou 'MILP' (optimazer_MILP.solver_milp);
+        - n_workers: Quantidade de processos (1 para executar no processo principal);
+        - seed: Semente base. A semente de cada cenário é derivada de (seed, índice do cenário) por np.random.SeedSequence, portanto o resultado de um cenário não depende da ordem de execução nem da quantidade de processos;
+        - delta: Limite de corte de carga (fração acima e abaixo da referência);
+
+    - Arquivos gerados em out_dir:
+        - scenario_XXXXX.npz: Para cada cenário, lucro, X, F, G, H, CV e as variáveis de decisão decompostas (p_exp ... u_dl);
+        - summary.csv: Uma linha por cenário (índice; semente; status; lucro; violação; tempo), acrescentada assim que o cenário termina;
+
+    - Retorna (summary: list[dict]): Resumo de cada cenário, ordenado pelo índice do cenário.
+'''
+
+# Despacho de um único cenário (executado em um processo do pool)
+def dispatch_scenario(k: int, data: dict, scenario: dict, method: str, seed: int, delta: float)-> dict:
+
+    data = apply_scenario(data, scenario, delta)
+
+    if method == 'GA':
+        res = solver(data, seed = seed, verbose = False)
+    elif method == 'MILP':
+        res = solver_milp(data)
+    else:
+        raise ValueError(f"Otimizador desconhecido: {method}. Utilize 'GA' ou 'MILP'.")
+
+    result = {'index': k, 'seed': seed, 'exec_time': res.exec_time, 'X': res.X}
+
+    if res.X is not None:
+        result['status'] = 'ok'
+        result['profit'] = - res.F[0]
+        result['F'] = res.F
+        result['G'] = res.G
+        result['H'] = res.H
+        result['CV'] = res.CV
+        result.update(zip(VARIABLES, decompose(res.X, data)))
+    else:
+        result['status'] = 'infeasible'
+        result['profit'] = np.nan
+        result['CV'] = np.array([np.nan])
+
+    return result
+
+# Gravando o resultado de um cenário em disco
+def save_result(result: dict, out_dir: Path)-> None:
+
+    arrays = {key: value for key, value in result.items() if value is not None and key != 'status'}
+    np.savez(out_dir / f"scenario_{result['index']:05d}.npz", status = result['status'], **arrays)
+
+    summary_path = out_dir / 'summary.csv'
+    if not summary_path.exists():
+        with open(summary_path, 'w') as file:
+            file.write('index;seed;status;profit;CV;exec_time\n')
+    with open(summary_path, 'a') as file:
+        file.write(f"{result['index']};{result['seed']};{result['status']};{result['profit']};{result['CV'][0]};{result['exec_time']}\n")
+
+def dispatch_scenarios(scenarios: list[dict], data: dict, out_dir: Path, method: str = 'MILP', n_workers: int = 1, seed: int = 1, delta: float = 0.2)-> list[dict]:
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents = True, exist_ok = True)
+    (out_dir / 'summary.csv').unlink(missing_ok = True)
+
+    # Uma semente independente por cenário
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(scenarios))]
+
+    summary = []
+
+    def collect(result: dict)-> None:
+        save_result(result, out_dir)
+        summary.append({key: result[key] for key in ['index', 'seed', 'status', 'profit', 'exec_time']})
+        print(f"Cenário {result['index']}: {result['status']}, lucro {result['profit']:.2f}, tempo {result['exec_time']:.2f} s")
+
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers = n_workers) as pool:
+            futures = [pool.submit(dispatch_scenario, k, data, scenario, method, seeds[k], delta) for k, scenario in enumerate(scenarios)]
+            for future in as_completed(futures):
+                collect(future.result())
+    else:
+        for k, scenario in enumerate(scenarios):
+            collect(dispatch_scenario(k, data, scenario, method, seeds[k], delta))
+
+    summary.sort(key = lambda item: item['index'])
+
+    return summary
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from generator_scenarios import import_scenarios_from_pickle
+    from vpp_initial_data import vpp_data
+    import os
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    cenarios = import_scenarios_from_pickle(path)
+
+    out_dir = Path(__file__).parent / 'BATCH_RESULTS'
+    summary = dispatch_scenarios(cenarios, data, out_dir, method = 'MILP', n_workers = os.cpu_count())
+
+    print(f'\n{len(summary)} cenários despachados, resultados em {out_dir}')
@@ -0,0 +1,182 @@
+from generator_scenarios import create_scenarios, apply_scenario
+from decompose_vetor import decompose, decompose_batch
+from objetive_function import obj_function, obj_function_batch
+from eq_constraints import eq_constr
+from ieq_constraints import ieq_constr, ieq_constr_batch
+from get_limits import bounds
+from load_projections import projections
+from optimazer_GA import solver, GA_IEQ_BLOCKS
+from vpp_layout import get_layout
+from vpp_initial_data import vpp_data
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import tracemalloc
+import platform
+import json
+import time
+import io
+
+'''
+    Este script tem a finalidade de medir o desempenho do caminho crítico do despacho da VPP e detectar regressões.
+
+    - Casos medidos: decompose, obj_function, eq_constr, ieq_constr (versões escalares, de referência), decompose_batch, obj_function_batch, ieq_constr_batch (caminho crítico do GA, sobre a população inteira de pop_size indivíduos), bounds, solver (GA completo com n_gen gerações), projections e create_scenarios;
+    - Varredura: período Nt (ex.: 24, 48 e 168 h), quantidade de ativos (Nbm, Nbat, Ndl), tamanho da população do GA (pop_size) e processos da avaliação (n_workers), de modo que a escalabilidade do pool seja medida na máquina de destino;
+    - Métricas de cada caso: tempo por chamada (s), avaliações por segundo e pico de memória alocada (tracemalloc, em bytes);
+    - Os dados de cada configuração são os parâmetros de vpp_data repetidos até a quantidade de ativos desejada e as projeções de uma janela de Nt horas (ano 0);
+
+    - Arquivos em BENCHMARKS:
+        - history.json: Uma entrada (data, plataforma e resultados) por execução, acrescentada a cada run;
+        - baseline.json: Resultados de referência. Um caso é uma regressão quando o tempo por chamada excede o da referência em mais de tolerance (fração);
+
+    - Execução: python benchmark.py (compara com a referência, ou a cria caso não exista) ou python benchmark.py --baseline (regrava a referência).
+'''
+
+# Pasta dos resultados dos benchmarks
+path = Path(__file__).parent / 'BENCHMARKS'
+
+# Varredura padrão
+NTS = [24, 48, 168] # Períodos de simulação
+ASSETS = [(3, 2, 2), (6, 4, 4)] # (Nbm, Nbat, Ndl)
+POP_SIZES = [100, 250] # Tamanhos da população do GA
+WORKERS = [1, 4] # Quantidade de processos da avaliação da população do GA
+
+# Parâmetros de cada tipo de ativo, repetidos até a quantidade desejada
+ASSET_KEYS = {'Nbm': ['p_bm_min', 'p_bm_max', 'p_bm_rup', 'p_bm_rdown', 'kappa_bm', 'kappa_bm_start'],
+              'Nbat': ['eta_chg', 'eta_dch', 'soc_min', 'soc_max', 'p_bat_max', 'kappa_bat']}
+
+# Dados da VPP com Nt horas e a quantidade de ativos informada
+def benchmark_data(Nt: int, Nbm: int, Nbat: int, Ndl: int, idx: int = 0)-> dict:
+
+    data = vpp_data()
+    data['Nt'] = Nt
+
+    for key, count in [('Nbm', Nbm), ('Nbat', Nbat)]:
+        data[key] = count
+        for name in ASSET_KEYS[key]:
+            data[name] = np.resize(data[name], count)
+
+    # Projeções de uma janela de Nt horas com as cargas despacháveis repetidas até Ndl
+    scenario = dict(zip(['p_l', 'p_pv', 'p_wt', 'p_dl_ref', 'tau_pld', 'tau_dist', 'tau_dl'], projections(data, 0, Nt, idx)))
+    scenario['p_dl_ref'] = np.resize(scenario['p_dl_ref'], (Ndl, Nt))
+    data['Ndl'] = Ndl
+
+    return apply_scenario(data, scenario)
+
+# Tempo por chamada e pico de memória de function()
+def measure(function, repeat: int)-> tuple[float, int]:
+
+    function() # Aquecimento (caches, importações tardias)
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    elapsed = (time.perf_counter() - start_time) / repeat
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+def run_benchmarks(Nts: list = NTS, assets: list = ASSETS, pop_sizes: list = POP_SIZES, workers: list = WORKERS, repeat: int = 200, n_gen: int = 5, n_scenarios: int = 10, seed: int = 1)-> list[dict]:
+
+    rng = np.random.default_rng(seed)
+    results = []
+
+    def record(case: str, params: dict, elapsed: float, peak: int, evals: int = 1):
+        results.append({'case': case, **params, 'time': elapsed, 'evals_per_s': evals / elapsed, 'peak_memory': peak})
+
+    for Nt in Nts:
+        for Nbm, Nbat, Ndl in assets:
+
+            data = benchmark_data(Nt, Nbm, Nbat, Ndl)
+            params = {'Nt': Nt, 'Nbm': Nbm, 'Nbat': Nbat, 'Ndl': Ndl}
+
+            ub, lb = bounds(data)
+            x = lb + rng.random(ub.shape) * (ub - lb)
+
+            # Funções avaliadas a cada indivíduo
+            for case, function in [('decompose', lambda: decompose(x, data)),
+                                   ('obj_function', lambda: obj_function(x, data)),
+                                   ('eq_constr', lambda: eq_constr(x, data)),
+                                   ('ieq_constr', lambda: ieq_constr(x, data)),
+                                   ('bounds', lambda: bounds(data, cache = False))]:
+                record(case, params, *measure(function, repeat))
+
+            # Funções avaliadas a cada geração do GA sobre a população inteira, como em MyProblem._evaluate (binarizada uma única vez)
+            layout = get_layout(data)
+            for pop_size in pop_sizes:
+                X = lb + rng.random((pop_size, ub.size)) * (ub - lb)
+                X[:, layout.Nr:] = X[:, layout.Nr:] > 0.5
+                for case, function in [('decompose_batch', lambda: decompose_batch(X, data, binarize = False, layout = layout)),
+                                       ('obj_function_batch', lambda: obj_function_batch(X, data, binarize = False, layout = layout)),
+                                       ('ieq_constr_batch', lambda: ieq_constr_batch(X, data, binarize = False, layout = layout, blocks = GA_IEQ_BLOCKS))]:
+                    record(case, dict(params, pop_size = pop_size), *measure(function, repeat), pop_size)
+
+            # GA completo por tamanho de população e quantidade de processos
+            for pop_size in pop_sizes:
+                for n_workers in workers:
+                    runs = []
+                    elapsed, peak = measure(lambda: runs.append(solver(data, n_workers = n_workers, seed = seed, verbose = False, n_gen = n_gen, pop_size = pop_size)), 1)
+                    record('solver', dict(params, pop_size = pop_size, n_gen = n_gen, n_workers = n_workers), elapsed, peak, runs[-1].algorithm.evaluator.n_eval)
+
+        # Projeções (independem da quantidade de ativos)
+        data = vpp_data()
+        data['Nt'] = Nt
+        record('projections', {'Nt': Nt}, *measure(lambda: projections(data, 0, Nt, 0), repeat))
+
+        with redirect_stdout(io.StringIO()): # create_scenarios exibe a data de cada cenário
+            elapsed, peak = measure(lambda: create_scenarios(n_scenarios, data), 1)
+        record('create_scenarios', {'Nt': Nt, 'Ns': n_scenarios}, elapsed, peak, n_scenarios)
+
+    return results
+
+# Identificação de um caso (nome e parâmetros), usada para comparar com a referência
+def case_key(result: dict)-> str:
+    return ', '.join(f'{key}={value}' for key, value in result.items() if key not in ['time', 'evals_per_s', 'peak_memory'])
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float = 0.25)-> list[dict]:
+
+    reference = {case_key(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        key = case_key(result)
+        if key in reference and result['time'] > reference[key]['time'] * (1 + tolerance):
+            regressions.append({'case': key, 'time': result['time'], 'baseline': reference[key]['time'], 'ratio': result['time'] / reference[key]['time']})
+
+    return regressions
+
+def save_history(results: list[dict])-> None:
+
+    path.mkdir(exist_ok = True)
+    history_path = path / 'history.json'
+    history = json.loads(history_path.read_text()) if history_path.exists() else []
+
+    history.append({'date': datetime.now().isoformat(timespec = 'seconds'), 'platform': platform.platform(), 'python': platform.python_version(), 'numpy': np.__version__, 'results': results})
+    history_path.write_text(json.dumps(history, indent = 1))
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    import sys
+
+    results = run_benchmarks()
+    save_history(results)
+
+    for result in results:
+        print(f"{case_key(result)}: {result['time'] * 1e3:.3f} ms, {result['evals_per_s']:.0f} aval/s, {result['peak_memory'] / 1e6:.2f} MB")
+
+    baseline_path = path / 'baseline.json'
+    if '--baseline' in sys.argv or not baseline_path.exists():
+        baseline_path.write_text(json.dumps(results, indent = 1))
+        print(f'\nReferência gravada em {baseline_path}')
+    else:
+        regressions = compare(results, json.loads(baseline_path.read_text()))
+        for regression in regressions:
+            print(f"REGRESSÃO {regression['case']}: {regression['time'] * 1e3:.3f} ms contra {regression['baseline'] * 1e3:.3f} ms ({regression['ratio']:.2f}x)")
+        print(f'\n{len(regressions)} regressões em {len(results)} casos')
+        sys.exit(1 if regressions else 0)
@@ -1,9 +1,10 @@
+from vpp_layout import VPPLayout, get_layout
 import numpy as np
 
 """
     Este script tem a finalidade de receber um vetor de variáveis de decisão (x), vindo de um otimizador, e o decompor em suas variáveis de decisão.
 
-    - Parâmetros de entrada (x: np.ndarray, data: dict):
+    - Parâmetros de entrada (x: np.ndarray, data: dict, binarize: bool):
 
         - (x:np.ndarray): vetor de variáveis de decisões otimizadas pelo otimizador (GA). (p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl):
             - p_exp: potência exportada pela VPP, shape (Nt,);
@@ -27,6 +28,10 @@ import numpy as np
             - Nbm: Quantidade de UBTMs da VPP;
             - Nbat: Quantidade de armazenadores da VPP;
 
+        - (binarize: bool): Binariza as variáveis inteiras (> 0.5). Use False quando x já foi binarizado, ex.: pelo _evaluate do GA, de modo que a binarização ocorra uma única vez por avaliação;
+
+    - As variáveis retornadas são views somente leitura de x (reshape sem cópia), com o leiaute de cada dimensão da VPP calculado uma única vez (vpp_layout.get_layout, ou o VPPLayout informado em layout). Somente a binarização aloca um array, compartilhado pelas variáveis inteiras;
+
     - Retorna uma tupla contendo um diversos array: -> tuple[np.ndarray]: Variáveis reais (p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, p_dl) e inteiras (u_exp, u_imp, u_bm, u_chg, u_dch, u_dl), onde:
         
         - p_exp: Potência de exportação da VPP, shape (Nt,);
@@ -46,118 +51,58 @@ import numpy as np
 
 """
 
-def decompose(x: np.ndarray, data: dict)-> tuple[np.ndarray]:
-
-    # Parâmetros iniciais de VPP
-    Nt = data['Nt'] # Período de simulação da VPP
-    Ndl = data['Ndl'] # Quantidade de cargas despacháveis da VPP
-    Nbm = data['Nbm'] # Quantidade de usinas de biomassa da VPP
-    Nbat = data['Nbat'] # Quantidade de armazenadores da VPP
-
-    # Definindo a quantidade de variáveis reais (Nr) e variáveis inteiras (Ni)
-    # Variáveis reais: p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Ndl)
-    # Variáveis inteiras: u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
-
-
-    # Definindo o vetor de variáveis reais (xr)
-    begin = 0
-    end = Nr
-    xr = np.array(x[begin: end])
-
-    # Definindo o vetor de variáveis inteiras (xi)
-    begin = end
-    end = end + Ni
-    xi = np.array(x[begin: end])
-
-    # Obtenção da potência de exportação (p_exp)
-    begin = 0
-    end =  Nt
-    p_exp = xr[begin: end]
-
-    # Obtenção da potência de importação (p_imp)
-    begin = end
-    end = end + Nt
-    p_imp = xr[begin: end]
-
-    # Obtenção da variável de decisão p_bm (potência da biomassa)
-    begin = end
-    end = end + (Nt * Nbm)
-    p_bm = xr[begin: end]
-    p_bm = p_bm.reshape((Nbm, Nt)) # Ajustando a dimensão de p_bm para (Nbm, Nt)
-
-    # Obtenção da variável de decisão gamma_bm (custo da biomassa)
-    begin = end
-    end = end + (Nt * Nbm)
-    gamma_bm = xr[begin: end]
-    gamma_bm = gamma_bm.reshape((Nbm, Nt)) # Ajustando a dimensão de gamma para (Nbm, Nt)
-
-    # Obtenção da variável de decisão p_chg (potência de carregamento dos armazenadores)
-    begin = end
-    end = end + (Nt * Nbat)
-    p_chg = xr[begin: end]
-    p_chg = p_chg.reshape((Nbat, Nt)) # Ajustando a dimensão de p_dch para (Nbat, Nt)
-
-    # Obtenção da variável de decisão p_dch (potência de descarregamento dos armazenadores)
-    begin = end
-    end = end + (Nt * Nbat)
-    p_dch = xr[begin: end]
-    p_dch = p_dch.reshape((Nbat, Nt)) # Ajustando a dimensão de p_chg para (Nbat, Nt)
-
-    # Obtenção da variável de decisão soc (State of Charge - Estado de Carga)
-    begin = end
-    end = end + (Nt * Nbat)
-    soc = xr[begin: end]
-    soc = soc.reshape((Nbat, Nt)) # Ajustando a dimensão de soc para (Nbat, Nt)
-
-    # Obtenção da variável de decisão p_dl (potência das cargas despacháveis)
-    begin = end
-    end = end + (Nt * Ndl)
-    p_dl = xr[begin: end]
-    p_dl = p_dl.reshape((Ndl, Nt)) # Ajustando a dimensão de p_dl para (Ndl, Nt)
-
-    # Obtenção da variável de estado de exportação (u_exp), onde: (0 = desligado e 1 ligado)
-    begin = 0
-    end = Nt
-    u_exp = xi[begin: end]
-    u_exp = np.float64(u_exp > 0.5) # Lógica para que u_exp seja binário, se > 0.5, então, u_exp = 1, cc. u_exp = 0
-
-    # Obtenção da variável de estado da potência de importação pela VPP (u_imp), onde: (0 = desligado e 1 ligado)
-    begin = end
-    end = end + Nt
-    u_imp = xi[begin: end]
-    u_imp = np.float64(u_imp > 0.5) # Lógica para que u_imp seja binário
-
-    # Obtenção da variável de estado da usinas de biomassa (u_bm), onde: (0 = desligado e 1 ligado)
-    begin = end
-    end = end + (Nt * Nbm)
-    u_bm = xi[begin: end]
-    u_bm = np.float64(u_bm > 0.5) # Lógica para que u_bm seja binário
-    u_bm = u_bm.reshape((Nbm, Nt)) # Ajustando a dimensão de u_bm para (Nbm, Nt) 
-
-    # Obtenção da variável de estado de carregamento dos armazenadores da VPP (u_chg), onde: (0 = desligado e 1 ligado)
-    begin = end
-    end = end + (Nt * Nbat)
-    u_chg = xi[begin: end]
-    u_chg = np.float64(u_chg > 0.5) # Lógica para que u_chg seja binário
-    u_chg = u_chg.reshape((Nbat, Nt)) # Ajustando a dimensão de u_bm para (Nbat, Nt) 
-
-    # Obtenção da variável de estado de descarregamento dos armazenadores da VPP (u_dch), onde: (0 = desligado e 1 ligado)
-    begin = end
-    end = end + (Nt * Nbat)
-    u_dch = xi[begin: end]
-    u_dch = np.float64(u_dch > 0.5) # Lógica para que u_bm seja binário
-    u_dch = u_dch.reshape((Nbat, Nt)) # Ajustando a dimensão de u_bm para (Nbat, Nt) 
-
-    # Obtenção da variável de estado das cargas despacháveis da VPP (u_dl), onde: (0 = desligado e 1 ligado)
-    begin = end
-    end = end + (Nt * Ndl)
-    u_dl = xi[begin: end]
-    u_dl = np.float64(u_dl > 0.5) # Lógica para que u_bm seja binário
-    u_dl = u_dl.reshape((Ndl, Nt)) # Ajustando a dimensão de u_bm para (Nbat, Nt) 
-
-    return p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
+def decompose(x: np.ndarray, data: dict, binarize: bool = True, layout: VPPLayout = None)-> tuple[np.ndarray]:
+    '''
+        As variáveis reais são views somente leitura de x (sem cópia). As inteiras são binarizadas em um único array (binarize = True) ou, quando x já é binário (binarize = False), também são views de x.
+    '''
+
+    layout = get_layout(data) if layout is None else layout
+    Nr, Ni = layout.Nr, layout.Ni
+
+    # View somente leitura de x, sem alterar o array do chamador
+    x = np.asarray(x).view()
+    x.flags.writeable = False
+
+    # Binarizando todas as variáveis inteiras de uma só vez: se > 0.5, então 1, cc. 0
+    xi = x[Nr: Nr + Ni]
+    if binarize:
+        xi = np.greater(xi, 0.5, out = np.empty(Ni), casting = 'unsafe')
+        xi.flags.writeable = False
+
+    variables = [x[block].reshape(shape) for block, shape in layout.real_blocks]
+    variables += [xi[block].reshape(shape) for block, shape in layout.int_blocks]
+
+    return tuple(variables)
+
+def decompose_batch(X: np.ndarray, data: dict, binarize: bool = True, layout: VPPLayout = None)-> tuple[np.ndarray]:
+    '''
+        Versão populacional de decompose: recebe uma matriz X, shape (n_pop, Nr + Ni), onde cada linha é um indivíduo, e retorna as mesmas variáveis de decisão com um eixo inicial de população, ex.: p_exp shape (n_pop, Nt) e p_bm shape (n_pop, Nbm, Nt).
+        As variáveis são views somente leitura de X (as inteiras de uma única matriz binarizada quando binarize = True).
+    '''
+
+    layout = get_layout(data) if layout is None else layout
+    Nr, Ni = layout.Nr, layout.Ni
+
+    X = np.atleast_2d(X).view()
+    X.flags.writeable = False
+    n_pop = X.shape[0] # Quantidade de indivíduos da população
+
+    Xi = X[:, Nr: Nr + Ni]
+    if binarize:
+        Xi = np.greater(Xi, 0.5, out = np.empty((n_pop, Ni)), casting = 'unsafe')
+        Xi.flags.writeable = False
+
+    variables = [X[:, block].reshape((n_pop,) + shape) for block, shape in layout.real_blocks]
+    variables += [Xi[:, block].reshape((n_pop,) + shape) for block, shape in layout.int_blocks]
+
+    return tuple(variables)
+
+def compose(variables: tuple[np.ndarray])-> np.ndarray:
+    '''
+        Operação inversa de decompose: recebe as variáveis de decisão (p_exp ... u_dl), na mesma ordem retornada por decompose, e as reagrupa em um único vetor x.
+    '''
+
+    return np.concatenate([np.ravel(var) for var in variables])
 
 # Exemplo de uso
 if __name__ == '__main__':
@@ -167,19 +112,10 @@ if __name__ == '__main__':
     # Obtendo os parâmetros iniciais
     data = vpp_data()
     data['Nt'] = 24
-    Nt = data['Nt']
-    Ndl = data['Ndl']
-    Nbm = data['Nbm']
-    Nbat = data['Nbat']
-
-    # Definindo a quantidade de variáveis reais (Nr) e variáveis inteiras (Ni)
-    # p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Nbat) + (Nt * Ndl)
-    # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
+    layout = get_layout(data) # Quantidade de variáveis reais (Nr) e inteiras (Ni)
 
     # Gerando um população inicial de teste
-    x = np.random.rand(Nr + Ni)
+    x = np.random.rand(layout.n_var)
 
     # Decompondo a população inicial em variáveis de decisão para teste
     p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl = decompose(x, data)
@@ -11,6 +11,7 @@ from decompose_vetor import decompose
                 - Nbat: Quantidade de armazenadores presentes na VPP;
                 - eta_chg: Rendimento de carregamento dos armazenadores da VPP;
                 - eta_dch: Rendimento de descarregamento dos armazenadores da VPP;
+                - soc_0 (opcional): Estado de carga dos armazenadores antes do início da simulação, shape (Nbat,). Quando ausente, as últimas Nbat restrições de soc_constr ficam nulas;
 
             - Projeções iniciais da VPP:
                 - p_wt: Potência das usinas EOs, shape (Nwt, Nt);
@@ -79,6 +80,13 @@ def eq_constr(x: np.ndarray, data: dict)-> np.ndarray:
             soc_constr[k] = soc[i, t] - soc[i, t - 1] - (p_chg[i, t] * eta_chg[i]) + (p_dch[i, t] / eta_dch[i])
             k += 1
 
+    # Estado de carga inicial (opcional, ex.: horizonte rolante): as últimas Nbat restrições ligam soc[i, 0] ao SoC ao fim da janela anterior (soc_0)
+    if 'soc_0' in data:
+        soc_0 = data['soc_0'] # Estado de carga antes do início da janela, shape (Nbat,)
+        for i in range(Nbat):
+            soc_constr[k] = soc[i, 0] - soc_0[i] - (p_chg[i, 0] * eta_chg[i]) + (p_dch[i, 0] / eta_dch[i])
+            k += 1
+
     # Vetor com todas as restrições de igualdade da VPP
     c_eq = np.concatenate((pwr_blc_constr, simul_constr, soc_constr))   
 
@@ -88,6 +96,7 @@ def eq_constr(x: np.ndarray, data: dict)-> np.ndarray:
 if __name__ == '__main__':
 
     from vpp_initial_data import vpp_data
+    from vpp_layout import get_layout
     from decompose_vetor import decompose
     from generator_scenarios import import_scenarios_from_pickle
     from pathlib import Path
@@ -95,17 +104,9 @@ if __name__ == '__main__':
     data = vpp_data()
 
     data['Nt'] = 24
-    Nt = data['Nt']
-    Ndl = data['Ndl']
-    Nbm = data['Nbm']
-    Nbat = data['Nbat']
-
-    # Definindo a quantidade de variáveis reais (Nr) e variáveis inteiras (Ni)
-    # p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nbat * Nt) + (Nbat * Nt) + (Ndl * Nt)
-    # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nbat * Nt) + (Ndl * Nt)
-    x = np.random.rand(Nr + Ni)
+    layout = get_layout(data) # Leiaute do vetor x (Nr variáveis reais e Ni inteiras)
+
+    x = np.random.rand(layout.n_var)
 
     path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
     cenarios = import_scenarios_from_pickle(path)
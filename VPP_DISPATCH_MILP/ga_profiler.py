@@ -0,0 +1,141 @@
+from pymoo.core.callback import Callback
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import time
+import json
+import csv
+
+'''
+    Este script tem a finalidade de instrumentar (opcionalmente) o GA de optimazer_GA, registrando por geração onde o tempo é gasto e a evolução da população.
+
+    - GAProfiler é um Callback do pymoo, chamado ao final de cada geração, e é ativado passando uma instância ao solver: solver(data, profiler = GAProfiler());
+    - O solver repassa profiler.timer ao problema, e MyProblem._evaluate cronometra cada etapa da avaliação (TIMERS) com esse gancho; nenhuma função dos módulos é substituída;
+    - Os tempos de obj_function e ieq_constr incluem as respectivas decomposições. O restante do tempo da geração (other) corresponde ao pymoo (seleção, cruzamento, mutação, reparo, sobrevivência e eliminação de duplicatas);
+    - Com n_workers > 1, obj_function e ieq_constr são avaliadas nos processos do pool e o tempo da avaliação paralela (incluindo a serialização dos blocos) é registrado em pool.
+
+    - Métricas de cada geração (records, uma linha por geração):
+        - n_gen: Geração;
+        - time: Tempo de parede da geração (s);
+        - n_eval, n_eval_total: Avaliações na geração e acumuladas;
+        - best_F, mean_F: Melhor e média da função objetivo (lucro com sinal negativo) da população;
+        - feasible: Fração de indivíduos factíveis da população;
+        - cv_sum, cv_mean: Soma e média da violação de restrições (CV) da população;
+        - <etapa>_time, <etapa>_calls: Tempo (s) e chamadas de cada etapa cronometrada na geração;
+        - other_time: Tempo da geração fora das etapas cronometradas (s).
+
+    - Exportação: to_csv(path) e to_json(path).
+'''
+
+# Etapas de MyProblem._evaluate cronometradas: binarização, função objetivo, restrições de desigualdade e avaliação no pool (n_workers > 1)
+TIMERS = ['binarize', 'obj_function', 'ieq_constr', 'pool']
+
+class GAProfiler(Callback):
+
+    def __init__(self):
+        super().__init__()
+        self.records = [] # Uma linha por geração
+        self.times = dict.fromkeys(TIMERS, 0.0) # Tempo acumulado de cada etapa (s)
+        self.calls = dict.fromkeys(TIMERS, 0) # Chamadas acumuladas de cada etapa
+        self._last = None # Instante do fim da geração anterior
+        self._last_times = dict(self.times)
+        self._last_calls = dict(self.calls)
+        self._last_eval = 0
+
+    # Marca o início da otimização (início da primeira geração)
+    def start(self)-> None:
+        self._last = time.perf_counter()
+
+    # Gancho de MyProblem._evaluate: cronometra o bloco with, acumulando na etapa name
+    @contextmanager
+    def timer(self, name: str):
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += time.perf_counter() - start_time
+            self.calls[name] += 1
+
+    def notify(self, algorithm):
+
+        now = time.perf_counter()
+        elapsed = now - (self._last if self._last is not None else now)
+        self._last = now
+
+        pop = algorithm.pop
+        F = pop.get('F')[:, 0]
+        CV = pop.get('CV')[:, 0]
+        n_eval = algorithm.evaluator.n_eval
+
+        record = {'n_gen': algorithm.n_gen,
+                  'time': elapsed,
+                  'n_eval': n_eval - self._last_eval,
+                  'n_eval_total': n_eval,
+                  'best_F': float(algorithm.opt.get('F')[0, 0]),
+                  'mean_F': float(np.mean(F)),
+                  'feasible': float(np.mean(pop.get('feas'))),
+                  'cv_sum': float(np.sum(CV)),
+                  'cv_mean': float(np.mean(CV))}
+
+        # Tempo e chamadas de cada etapa na geração
+        timed_time = 0.0
+        for name in self.times:
+            record[f'{name}_time'] = self.times[name] - self._last_times[name]
+            record[f'{name}_calls'] = self.calls[name] - self._last_calls[name]
+            timed_time += record[f'{name}_time']
+        record['other_time'] = max(elapsed - timed_time, 0.0)
+
+        self._last_times = dict(self.times)
+        self._last_calls = dict(self.calls)
+        self._last_eval = n_eval
+        self.records.append(record)
+
+    # Resumo da otimização: tempo total e tempo acumulado de cada etapa
+    def summary(self)-> dict:
+
+        total = sum(record['time'] for record in self.records)
+        summary = {'n_gen': len(self.records), 'time': total, 'n_eval': self._last_eval}
+        for name in self.times:
+            summary[f'{name}_time'] = self.times[name]
+            summary[f'{name}_calls'] = self.calls[name]
+        summary['other_time'] = sum(record['other_time'] for record in self.records)
+
+        return summary
+
+    def to_csv(self, path: str | Path)-> None:
+
+        with open(path, 'w', newline = '', encoding = 'utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames = list(self.records[0].keys()) if self.records else [])
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    def to_json(self, path: str | Path)-> None:
+
+        with open(path, 'w', encoding = 'utf-8') as file:
+            json.dump({'summary': self.summary(), 'generations': self.records}, file, indent = 1)
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from vpp_initial_data import vpp_data
+    from generator_scenarios import import_scenarios_from_pickle, apply_scenario
+    from optimazer_GA import solver
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    data = apply_scenario(data, import_scenarios_from_pickle(path)[0])
+
+    profiler = GAProfiler()
+    res = solver(data, verbose = False, n_gen = 50, profiler = profiler)
+
+    summary = profiler.summary()
+    print(f"{summary['n_gen']} gerações em {summary['time']:.2f} s, {summary['n_eval']} avaliações")
+    for name in TIMERS:
+        print(f"{name}: {summary[f'{name}_time']:.3f} s ({summary[f'{name}_calls']} chamadas)")
+    print(f"pymoo: {summary['other_time']:.3f} s")
+
+    profiler.to_csv(Path(__file__).parent / 'ga_profile.csv')
+    profiler.to_json(Path(__file__).parent / 'ga_profile.json')
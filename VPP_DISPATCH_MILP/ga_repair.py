@@ -0,0 +1,116 @@
+from pymoo.core.repair import Repair
+from vpp_layout import VPPLayout, get_layout
+import numpy as np
+
+'''
+    Este script tem a finalidade de reparar (opcionalmente) a população do GA de optimazer_GA antes de cada avaliação, de modo que o orçamento de avaliações seja gasto com indivíduos que respeitam a física da VPP.
+
+    - VPPRepair é um Repair do pymoo, ativado por solver(data, repair = True), que opera sobre a população inteira (X, shape (n_pop, n_var)) com views de cada variável (vpp_layout):
+        - Variáveis inteiras: binarizadas (> 0.5) e gravadas como 0 ou 1;
+        - Importação/exportação: u_imp = 1 - u_exp, p_exp = 0 quando u_exp = 0 e p_imp = 0 quando u_imp = 0;
+        - UBTMs: p_bm limitado a [p_bm_min * u_bm, p_bm_max * u_bm] e aos limites do problema; uma UBTM com p_bm > 0 após os limites (ex.: p_bm_min > 0) é ligada (u_bm = 1);
+        - Custo das UBTMs: gamma_bm = kappa_bm * p_bm + kappa_bm_start, o menor custo que satisfaz a restrição de custo, dentro dos limites do problema;
+        - Armazenadores: u_chg + u_dch <= 1 (com ambos ligados, mantém o estado de maior valor contínuo), p_chg <= p_bat_max * u_chg e p_dch <= p_bat_max * u_dch;
+        - Estado de carga: soc integrado a partir de soc[:, 0] (ou de soc_0, se informado) com soc[t] = soc[t - 1] + eta_chg * p_chg[t] - p_dch[t] / eta_dch, limitando p_chg e p_dch para que soc permaneça entre soc_min e soc_max;
+
+    - Os laços percorrem somente os Nt instantes do estado de carga; as demais operações são vetorizadas sobre a população.
+'''
+
+class VPPRepair(Repair):
+
+    def __init__(self, data: dict, layout: VPPLayout = None, **kwargs):
+        super().__init__(**kwargs)
+        self.data = data
+        self.layout = get_layout(data) if layout is None else layout
+
+    def _do(self, problem, X, **kwargs):
+
+        data = self.data
+        layout = self.layout
+        n_pop = X.shape[0]
+
+        # Views (n_pop, N, Nt) de cada variável de X, alteradas no próprio X
+        def view(name: str)-> np.ndarray:
+            return X[:, layout.slices[name]].reshape((n_pop,) + layout.shapes[name])
+
+        def bounds(name: str)-> tuple[np.ndarray]:
+            return problem.xl[layout.slices[name]].reshape(layout.shapes[name]), problem.xu[layout.slices[name]].reshape(layout.shapes[name])
+
+        # Ordem entre carga e descarga antes da binarização: com ambos ligados, mantém o de maior valor
+        u_chg, u_dch = view('u_chg'), view('u_dch')
+        both = (u_chg > 0.5) & (u_dch > 0.5)
+        charge_first = u_chg >= u_dch
+
+        # Binarizando as variáveis inteiras
+        Xi = X[:, layout.Nr:]
+        Xi[:] = Xi > 0.5
+
+        # Simultaneidade de carga e descarga: u_chg + u_dch <= 1
+        u_dch[both & charge_first] = 0
+        u_chg[both & ~ charge_first] = 0
+
+        # Importação e exportação exclusivas: u_exp + u_imp = 1
+        u_exp, u_imp = view('u_exp'), view('u_imp')
+        u_imp[:] = 1 - u_exp
+        view('p_exp')[:] *= u_exp
+        view('p_imp')[:] *= u_imp
+
+        # UBTMs: p_bm entre p_bm_min * u_bm e p_bm_max * u_bm, e dentro dos limites do problema
+        p_bm, u_bm = view('p_bm'), view('u_bm')
+        lb, ub = bounds('p_bm')
+        np.clip(p_bm, data['p_bm_min'][:, None] * u_bm, data['p_bm_max'][:, None] * u_bm, out = p_bm)
+        np.clip(p_bm, lb, ub, out = p_bm)
+        u_bm[p_bm > 0] = 1 # UBTM com potência positiva imposta pelos limites (ex.: p_bm_min > 0) é ligada
+
+        # Menor custo das UBTMs que satisfaz kappa_bm * p_bm + kappa_bm_start - gamma_bm <= 0
+        lb, ub = bounds('gamma_bm')
+        gamma_bm = view('gamma_bm')
+        gamma_bm[:] = np.clip(data['kappa_bm'][:, None] * p_bm + data['kappa_bm_start'][:, None], lb, ub)
+
+        # Armazenadores: potências nulas com o estado desligado
+        p_bat_max = data['p_bat_max'][:, None]
+        p_chg, p_dch, soc = view('p_chg'), view('p_dch'), view('soc')
+        np.minimum(p_chg, p_bat_max * u_chg, out = p_chg)
+        np.minimum(p_dch, p_bat_max * u_dch, out = p_dch)
+
+        # Integração do estado de carga, limitando carga e descarga à capacidade disponível
+        eta_chg, eta_dch = data['eta_chg'], data['eta_dch']
+        soc_min, soc_max = data['soc_min'], data['soc_max']
+        if 'soc_0' in data:
+            previous, begin = np.broadcast_to(data['soc_0'], (n_pop, layout.Nbat)), 0
+        else:
+            np.clip(soc[:, :, 0], soc_min, soc_max, out = soc[:, :, 0])
+            previous, begin = soc[:, :, 0], 1
+
+        for t in range(begin, layout.Nt):
+            np.minimum(p_chg[:, :, t], (soc_max - previous) / eta_chg, out = p_chg[:, :, t])
+            np.minimum(p_dch[:, :, t], (previous - soc_min) * eta_dch, out = p_dch[:, :, t])
+            np.maximum(p_chg[:, :, t], 0, out = p_chg[:, :, t])
+            np.maximum(p_dch[:, :, t], 0, out = p_dch[:, :, t])
+            soc[:, :, t] = previous + eta_chg * p_chg[:, :, t] - p_dch[:, :, t] / eta_dch
+            previous = soc[:, :, t]
+
+        return X
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from vpp_initial_data import vpp_data
+    from generator_scenarios import import_scenarios_from_pickle, apply_scenario
+    from ga_profiler import GAProfiler
+    from optimazer_GA import solver
+    from pathlib import Path
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    data = apply_scenario(data, import_scenarios_from_pickle(path)[0])
+
+    # Mesmo orçamento de gerações com e sem reparo
+    for repair in [False, True]:
+        profiler = GAProfiler()
+        res = solver(data, verbose = False, n_gen = 100, repair = repair, profiler = profiler)
+        feasible = [record['n_gen'] for record in profiler.records if record['feasible'] > 0]
+        print(f"repair = {repair}: lucro {- res.F[0] if res.X is not None else float('nan'):.2f}, "
+              f"primeira geração factível {feasible[0] if feasible else None}, tempo {profiler.summary()['time']:.2f} s")
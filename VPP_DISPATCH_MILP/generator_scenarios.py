@@ -1,6 +1,7 @@
 from load_projections import projections
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterator
 import numpy as np
 import pickle
 
@@ -60,6 +61,67 @@ import pickle
         Retorno:
             - scenarios (list[dict[str, np.ndarray]]): 
                 Lista de dicionários com os dados de cada cenário importado.
+
+    ------------------------------------------------------------------------
+    4. [apply_scenario]
+
+        Cria uma cópia do dicionário de parâmetros da VPP com as projeções
+        de um cenário e a banda de corte das cargas despacháveis.
+
+        Parâmetros:
+            - data (dict): Dicionário com os parâmetros iniciais da VPP.
+            - scenario (dict[str, np.ndarray]): Cenário gerado por
+              `create_scenarios`.
+            - delta (float): Limite de corte de carga (fração acima e
+              abaixo da referência). Default: 0.2
+
+        Retorno:
+            - data (dict): Novo dicionário pronto para os otimizadores.
+
+    ------------------------------------------------------------------------
+    5. [create_scenario_bank], [save_scenarios_to_bank] e
+       [import_scenarios_from_bank]
+
+        Banco de cenários: uma pasta com um arquivo .npy por campo
+        (p_l, p_pv, p_wt, p_dl_ref, tau_pld, tau_dist, tau_dl), com um eixo
+        inicial de cenários, ex.: p_l shape (Ns, Nl, Nt), e um índice
+        index.npy, shape (Ns, 2), com o ano e a hora de início de cada
+        cenário. Os arquivos são gravados incrementalmente e abertos com
+        mmap_mode = 'r', de modo que somente os cenários acessados são
+        lidos do disco (escala para centenas de milhares de cenários).
+
+        Parâmetros:
+            - Ns (int) e data (dict): Como em `create_scenarios`.
+            - scenarios (list[dict[str, np.ndarray]]): Cenários a salvar,
+              ex.: de `import_scenarios_from_pickle`.
+            - path (Path): Pasta do banco de cenários.
+            - index (np.ndarray): Ano e hora de início de cada cenário
+              (None para -1).
+
+        Retorno:
+            - ScenarioBank: Sequência de cenários com acesso aleatório
+              (len, bank[k] e iteração), onde cada cenário é um dicionário
+              como os de `create_scenarios`.
+
+    ------------------------------------------------------------------------
+    6. [iter_projections]
+
+        Percorre todas as janelas de Nt horas de cada ano, produzindo
+        (date, p_l, p_pv, p_wt, p_dl_ref, tau_pld, tau_dist, tau_dl) sob
+        demanda. As projeções de cada ano são carregadas uma única vez e
+        cada janela é uma view (sem cópia, somente leitura) desses arrays,
+        de modo que a memória permanece constante com dezenas de milhares
+        de janelas (ex.: backtests).
+
+        Parâmetros:
+            - data (dict): Parâmetros iniciais da VPP, incluindo Nt.
+            - years (list[int]): Linhas (anos) das séries geradas, de 0 a
+              10 (None para todos os anos).
+            - step (int): Avanço em horas entre janelas. Default: 1
+
+        Retorno:
+            - Iterator[tuple]: Data e hora de início (datetime) e as
+              projeções da janela, como em `projections`.
 '''
 
 def create_scenarios(Ns: int, data: dict) -> list[dict[str, np.ndarray]]:
@@ -114,6 +176,132 @@ def import_scenarios_from_pickle(path: Path) -> list[dict[str, np.ndarray]]:
         scenarios = pickle.load(file)
     return scenarios
 
+# Campos de cada cenário armazenados no banco de cenários
+FIELDS = ['p_l', 'p_pv', 'p_wt', 'p_dl_ref', 'tau_pld', 'tau_dist', 'tau_dl']
+
+# Banco de cenários mapeado em memória: cada cenário só é lido do disco quando acessado
+class ScenarioBank:
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.fields = {key: np.load(self.path / f'{key}.npy', mmap_mode = 'r') for key in FIELDS}
+        self.index = np.load(self.path / 'index.npy') # Ano e hora de início de cada cenário, shape (Ns, 2)
+
+    def __len__(self) -> int:
+        return self.index.shape[0]
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        return {key: np.array(value[k]) for key, value in self.fields.items()}
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+# Arquivos .npy do banco de cenários, gravados incrementalmente (sem manter todos os cenários na memória)
+def _open_bank(path: Path, Ns: int, shapes: dict[str, tuple]) -> tuple[dict, np.ndarray]:
+
+    path = Path(path)
+    path.mkdir(parents = True, exist_ok = True)
+
+    fields = {key: np.lib.format.open_memmap(path / f'{key}.npy', mode = 'w+', dtype = np.float64, shape = (Ns,) + shapes[key]) for key in FIELDS}
+    index = np.lib.format.open_memmap(path / 'index.npy', mode = 'w+', dtype = np.int64, shape = (Ns, 2))
+
+    return fields, index
+
+# Função para gerar os cenários diretamente em um banco de cenários
+def create_scenario_bank(Ns: int, data: dict, path: Path) -> ScenarioBank:
+
+    Nt = data['Nt']
+    Npoints = 8760  # Total de horas em um ano
+    base_year = 2013
+    total_years = 11  # De 2013 até 2023
+
+    # Sorteia um único dia e hora (fixo para todos os cenários), como em create_scenarios
+    max_start_day = (Npoints - Nt) // 24
+    begin = np.random.randint(0, max_start_day) * 24
+    end = begin + Nt
+
+    fields, index = None, None
+
+    for n in range(Ns):
+
+        idx = np.random.choice(total_years)  # idx de 0 a 10
+        scenario = dict(zip(FIELDS, projections(data, begin, end, idx)))
+
+        # Criando os arquivos a partir do formato do primeiro cenário
+        if fields is None:
+            fields, index = _open_bank(path, Ns, {key: value.shape for key, value in scenario.items()})
+
+        for key in FIELDS:
+            fields[key][n] = scenario[key]
+        index[n] = (base_year + idx, begin)
+
+    # Sem cenários (Ns = 0), o banco é criado vazio com o formato das projeções do primeiro ano
+    if fields is None:
+        scenario = dict(zip(FIELDS, projections(data, begin, end, 0)))
+        fields, index = _open_bank(path, 0, {key: value.shape for key, value in scenario.items()})
+
+    for array in list(fields.values()) + [index]:
+        array.flush()
+
+    return ScenarioBank(path)
+
+# Função para salvar uma lista de cenários (ex.: de um arquivo .pkl) em um banco de cenários
+def save_scenarios_to_bank(scenarios: list[dict[str, np.ndarray]], path: Path, index: np.ndarray = None) -> None:
+
+    Ns = len(scenarios)
+    fields, bank_index = _open_bank(path, Ns, {key: np.shape(scenarios[0][key]) for key in FIELDS})
+
+    for n, scenario in enumerate(scenarios):
+        for key in FIELDS:
+            fields[key][n] = scenario[key]
+
+    # Ano e hora de início (-1 quando desconhecidos, como nos cenários em .pkl)
+    bank_index[:] = -1 if index is None else index
+
+    for array in list(fields.values()) + [bank_index]:
+        array.flush()
+
+# Função para abrir um banco de cenários
+def import_scenarios_from_bank(path: Path) -> ScenarioBank:
+    return ScenarioBank(path)
+
+# Gerador de janelas de Nt horas de cada ano, views das projeções do ano carregadas uma única vez
+def iter_projections(data: dict, years: list = None, step: int = 1) -> Iterator[tuple]:
+
+    Nt = data['Nt']
+    Npoints = 8760  # Total de horas em um ano
+    base_year = 2013
+    total_years = 11  # De 2013 até 2023
+
+    years = range(total_years) if years is None else years
+
+    for idx in years:
+
+        # Projeções do ano inteiro (linha = idx), somente leitura pois as janelas são views
+        year = projections(dict(data, Nt = Npoints), 0, Npoints, idx)
+        for array in year:
+            array.flags.writeable = False
+
+        for begin in range(0, Npoints - Nt + 1, step):
+            date = datetime(base_year + idx, 1, 1) + timedelta(hours = begin)
+            yield (date,) + tuple(array[..., begin: begin + Nt] for array in year)
+
+# Função para aplicar um cenário aos parâmetros iniciais da VPP
+def apply_scenario(data: dict, scenario: dict[str, np.ndarray], delta: float = 0.2) -> dict:
+
+    data = dict(data)
+    for key in ['p_l', 'p_pv', 'p_wt', 'p_dl_ref', 'tau_pld', 'tau_dist', 'tau_dl']:
+        data[key] = scenario[key]
+
+    #  Definindo banda de corte de carga baseado no percentual fornecido
+    data['p_dl_max'] = data['p_dl_ref'] + data['p_dl_ref'] * delta
+    data['p_dl_min'] = data['p_dl_ref'] - data['p_dl_ref'] * delta
+
+    return data
+
 # Teste de uso   
 if __name__ == '__main__':
 
@@ -1,10 +1,15 @@
+from vpp_layout import VPPLayout, get_layout
+from collections import OrderedDict
 import numpy as np
+import hashlib
 
 '''
     Este script tem a finalidade de fornecer a um otimizador os limites máximo e mínimo que as variáveis de decisão podem assumir em cada iteração t no período da simulação Nt.
 
-        - Parâmetros de entrada: (data: dict):
+        - Parâmetros de entrada: (data: dict, layout: VPPLayout, cache: bool):
             - data: Dicionário contendo os parâmetros iniciais, projeções iniciais temporais e variáveis de decisão fornecidas pelo otimizador.
+            - layout: Leiaute do vetor x (None para get_layout(data));
+            - cache: Reutiliza os limites já calculados para o mesmo leiaute e o mesmo cenário (sha1 dos parâmetros de BOUNDS_KEYS), de modo que solves repetidos do mesmo cenário não refazem o cálculo;
 
                 -Projeções iniciais:
                     - Nt: Período da simulação da VPP;
@@ -17,6 +22,7 @@ import numpy as np
                     - p_bm_min: Potênica mínima das UBTMs da VPP, shape (NBM,);
                     - p_bm_max: Potênica máxima das UBTMs da VPP, shape (NBM,);
                     - kappa_bm: tarifa de custo operacional das UBTMs da VPP, shape (Nbm,);
+                    - p_bm_0 (opcional): Potência das UBTMs antes do início da simulação, shape (Nbm,), que limita p_bm[:, 0] pelas rampas p_bm_rup e p_bm_rdown;
 
                 - Projeções temporais iniciais:
                     - p_l: Potência das cargas NÂO despacháveis da VPP, shape (Npv, Nt);
@@ -28,118 +34,97 @@ import numpy as np
                 - Variável de decisão:
                     - p_bm: Potência da usinas de geração à biomassa (UBTMs) da VPP, shape (Nbm, Nt);
 
+    - Os limites são montados por blocos (np.repeat dos limites de cada ativo nos Nt instantes e concatenação), na mesma ordem i-major do vetor x (ver decompose).
+
     - Retorna upper_bounds, lower_bounds:
         - upper_bonds: Vetor de limites superiores das variáveis de decisão
         - lower_bonds: Vetor de limites inferiores das variáveis de decisão        
 '''
 
-def bounds(data: dict)-> tuple[np.ndarray]:
+# Parâmetros de data utilizados nos limites, que identificam o cenário no cache
+BOUNDS_KEYS = ['p_bm_min', 'p_bm_max', 'kappa_bm', 'p_bat_max', 'soc_min', 'soc_max', 'p_dl_min', 'p_dl_max', 'p_pv', 'p_wt', 'p_l', 'p_bm_0', 'p_bm_rup', 'p_bm_rdown']
+MAX_CACHE_SIZE = 32 # Quantidade máxima de limites mantidos em cache (descartando os usados há mais tempo)
+_cache = OrderedDict()
 
-    # Parâmetros iniciais da VPP
-    Nt = data['Nt'] # Período da simulação da VPP
-    Nbm = data['Nbm'] # Quantidade de UBTMs
-    Ndl = data['Ndl'] # Quantidade de carga despacháveis
-    Nbat = data['Nbat'] # Quantidade de armazenadores
+# Chave do cache: leiaute e sha1 dos parâmetros de BOUNDS_KEYS presentes em data
+def _bounds_key(data: dict, layout: VPPLayout)-> tuple:
 
-    # Parâmetros das UBTMs
-    # p_bm = data['p_bm'] # Potênica das UBTMs
-    p_bm_min = data['p_bm_min'] # Potênica mínima das UBTMs
-    p_bm_max = data['p_bm_max'] # Potênica máxima das UBTMS
-    kappa_bm = data['kappa_bm'] # Tarifa operacional das UBTMs
+    digest = hashlib.sha1()
+    for key in BOUNDS_KEYS:
+        if key in data:
+            digest.update(key.encode())
+            digest.update(np.ascontiguousarray(data[key], dtype = np.float64).tobytes())
+
+    return layout, digest.hexdigest()
+
+def bounds(data: dict, layout: VPPLayout = None, cache: bool = True)-> tuple[np.ndarray]:
+
+    # Leiaute do vetor x (Nr variáveis reais e Ni inteiras)
+    layout = get_layout(data) if layout is None else layout
+
+    if cache:
+        key = _bounds_key(data, layout)
+        if key in _cache:
+            _cache.move_to_end(key)
+            upper_bounds, lower_bounds = _cache[key]
+            return upper_bounds.copy(), lower_bounds.copy()
+
+    # Parâmetros iniciais da VPP
+    Nt = layout.Nt # Período da simulação da VPP
+    Ndl = layout.Ndl # Quantidade de carga despacháveis
+    Nbat = layout.Nbat # Quantidade de armazenadores
 
     # Parâmetros das UBTMs
-    p_bat_max = data['p_bat_max'] # Potênica máxima de carregamento/descarregamento dos armazenadores 
-    soc_min = data['soc_min'] # Nível mínimo de carga da bateria
-    soc_max = data['soc_max'] # Nível máximo de carga da bateria
-
-    # Parâmetro das cargas despacháveis
-    p_dl_max = data['p_dl_max'] # Potência mínima despachável carga
-    p_dl_min = data['p_dl_min'] # Potência mínima despachável carga
-
-    # Parâmetro das usinas solares
-    p_pv = data['p_pv'] # Potência das usinas solares
-
-    # Parâmetro das usinas eólicas
-    p_wt = data['p_wt'] # Potência das usinas eólicas
-
-    # Parâmetro das cargas não despacháveis
-    p_l = data['p_l'] # Potência da cargas NÂO despacháveis
-
-    # Calculando a potência instalada no instante t no período da simulação Nt
-    p_inst = np.zeros(Nt) # Vetor de potência instalada em cada instante t
-    for t in range(Nt):
-        p_inst[t] = np.sum(p_pv[:, t]) + np.sum(p_wt[:, t]) + np.max(soc_max) + np.max(p_bm_max)
-
-    # Calculando a carga demandada no instante t no período da simulação Nt
-    demanded_load = np.zeros(Nt) # Vetor de carga demandada em cada instante t
-    for t in range(Nt):
-        demanded_load[t] = np.sum(p_l[:, t]) - np.max(soc_min)
-
-    # Definindo a quantidade de variáveis reais (Nr) e inteiras (Ni)
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Nbat) + (Nt * Ndl)
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
-
-    # Iniciando os vetores limitadores superior e inferior das variáveis de decisão
-    upper_bounds = np.ones(Nr + Ni)
-    lower_bounds = np.zeros(Nr + Ni)
-    k = 0
-
-    # Limite de p_exp
-    for t in range(Nt):
-        upper_bounds[k] = p_inst[t]
-        lower_bounds[k] = 0
-        k += 1
-
-    # Limite de p_imp
-    for t in range(Nt):
-        upper_bounds[k] = demanded_load[t]
-        lower_bounds[k] = 0
-        k += 1
-
-    # Limite de p_bm
-    for t in range(Nt):
-        for i in range(Nbm):
-            upper_bounds[k] = p_bm_max[i]
-            lower_bounds[k] = p_bm_min[i]
-            k += 1
-
-    # Limite de gamma_bm
-    for t in range(Nt):
-        for i in range(Nbm):
-            upper_bounds[k] = p_bm_max[i] * kappa_bm[i]
-            lower_bounds[k] = p_bm_min[i] * kappa_bm[i]
-            k += 1
-
-    # Limite de p_chg
-    for t in range(Nt):
-        for i in range(Nbat):
-            upper_bounds[k] = p_bat_max[i]
-            lower_bounds[k] = 0
-            k += 1
-
-    # Limite de p_dch
-    for t in range(Nt):
-        for i in range(Nbat):
-            upper_bounds[k] = p_bat_max[i]
-            lower_bounds[k] = 0
-            k += 1
-
-    # Limite de soc
-    for t in range(Nt):
-        for i in range(Nbat):
-            upper_bounds[k] = soc_max[i]
-            lower_bounds[k] = soc_min[i]
-            k += 1
- 
-    # Limite de p_dl
-    for t in range(Nt):
-        for i in range(Ndl):
-            upper_bounds[k] = p_dl_max[i, t]
-            lower_bounds[k] = p_dl_min[i, t]
-            k += 1
-
-
-    # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl: upper_bounds = 1 and lower_bounds = 0
+    p_bm_min = np.asarray(data['p_bm_min']) # Potênica mínima das UBTMs
+    p_bm_max = np.asarray(data['p_bm_max']) # Potênica máxima das UBTMS
+    kappa_bm = np.asarray(data['kappa_bm']) # Tarifa operacional das UBTMs
+
+    # Parâmetros dos armazenadores
+    p_bat_max = np.asarray(data['p_bat_max']) # Potênica máxima de carregamento/descarregamento dos armazenadores
+    soc_min = np.asarray(data['soc_min']) # Nível mínimo de carga da bateria
+    soc_max = np.asarray(data['soc_max']) # Nível máximo de carga da bateria
+
+    # Parâmetro das cargas despacháveis, shape (Ndl, Nt)
+    p_dl_max = np.broadcast_to(data['p_dl_max'], (Ndl, Nt)) # Potência máxima despachável carga
+    p_dl_min = np.broadcast_to(data['p_dl_min'], (Ndl, Nt)) # Potência mínima despachável carga
+
+    # Potência instalada em cada instante t no período da simulação Nt
+    p_inst = np.sum(data['p_pv'], axis = 0) + np.sum(data['p_wt'], axis = 0) + np.max(soc_max) + np.max(p_bm_max)
+
+    # Carga demandada em cada instante t no período da simulação Nt
+    demanded_load = np.sum(data['p_l'], axis = 0) - np.max(soc_min)
+
+    # Blocos de limites na ordem do vetor x (i-major: o limite de cada ativo repetido nos Nt instantes)
+    zeros = np.zeros(Nt)
+    upper_bounds = np.concatenate((p_inst, # p_exp
+                                   demanded_load, # p_imp
+                                   np.repeat(p_bm_max, Nt), # p_bm
+                                   np.repeat(p_bm_max * kappa_bm, Nt), # gamma_bm
+                                   np.repeat(p_bat_max, Nt), # p_chg
+                                   np.repeat(p_bat_max, Nt), # p_dch
+                                   np.repeat(soc_max, Nt), # soc
+                                   p_dl_max.ravel(), # p_dl
+                                   np.ones(layout.Ni))) # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
+    lower_bounds = np.concatenate((zeros, # p_exp
+                                   zeros, # p_imp
+                                   np.repeat(p_bm_min, Nt), # p_bm
+                                   np.repeat(p_bm_min * kappa_bm, Nt), # gamma_bm
+                                   np.zeros(2 * Nbat * Nt), # p_chg e p_dch
+                                   np.repeat(soc_min, Nt), # soc
+                                   p_dl_min.ravel(), # p_dl
+                                   np.zeros(layout.Ni))) # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
+
+    # Rampa no primeiro instante em relação à potência anterior à simulação (opcional, ex.: horizonte rolante)
+    if 'p_bm_0' in data:
+        p_bm_0 = np.asarray(data['p_bm_0']) # Potência das UBTMs antes do início da simulação, shape (Nbm,)
+        k = layout.slices['p_bm'].start + np.arange(layout.Nbm) * Nt # Posição de p_bm[i, 0] no vetor x
+        upper_bounds[k] = np.minimum(upper_bounds[k], p_bm_0 + data['p_bm_rup'])
+        lower_bounds[k] = np.minimum(np.maximum(lower_bounds[k], p_bm_0 - data['p_bm_rdown']), upper_bounds[k])
+
+    if cache:
+        _cache[key] = (upper_bounds.copy(), lower_bounds.copy())
+        while len(_cache) > MAX_CACHE_SIZE:
+            _cache.popitem(last = False)
 
     return upper_bounds, lower_bounds
 
@@ -147,6 +132,7 @@ def bounds(data: dict)-> tuple[np.ndarray]:
 if __name__ == '__main__':
 
     from vpp_initial_data import vpp_data
+    from vpp_layout import get_layout
     from decompose_vetor import decompose
     from generator_scenarios import import_scenarios_from_pickle
     from pathlib import Path
@@ -154,19 +140,10 @@ if __name__ == '__main__':
     # Obtenção dos parâmetros iniciais
     data = vpp_data()
     data['Nt'] = 24
-    Nt = data['Nt']
-    Ndl = data['Ndl']
-    Nbm = data['Nbm']
-    Nbat = data['Nbat']
-
-    # Definindo a quantidade de variáveis reais (Nr) e variáveis inteiras (Ni)
-    # p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Nbat) + (Nt * Ndl)
-    # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
+    layout = get_layout(data) # Leiaute do vetor x (Nr variáveis reais e Ni inteiras)
 
     # Gerando um poppulação inicial para teste
-    x = np.random.rand(Nr + Ni)
+    x = np.random.rand(layout.n_var)
 
     # Decompondo a população em variáveis de decisão
     p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl = decompose(x, data)
@@ -1,5 +1,6 @@
 import numpy as np
-from decompose_vetor import decompose
+from decompose_vetor import decompose, decompose_batch
+from vpp_layout import VPPLayout
 
 '''
     Este script tem a finalidade de fornecer uma função de restrições de desigualdades de uma VPP a um otimizador (GA), para que o mesmo encontre a solução ótima da função objetivo, sem que haja violação das restrições.
@@ -167,30 +168,81 @@ def ieq_constr(x: np.ndarray, data: dict)-> np.ndarray[np.ndarray]:
     # return c_ieq
     return bm_constr
 
+# Blocos de restrições de desigualdade na ordem de ieq_constr (e de VPPLayout.ieq_rows)
+IEQ_BLOCKS = ('imp', 'exp', 'bm', 'bat', 'dl')
+
+def ieq_constr_batch(X: np.ndarray, data: dict, binarize: bool = True, layout: VPPLayout = None, blocks: tuple = IEQ_BLOCKS)-> np.ndarray:
+    '''
+        Versão populacional de ieq_constr: recebe uma matriz X, shape (n_pop, Nr + Ni), e retorna a matriz G, shape (n_pop, n_ieq), com os blocos de blocks na ordem de IEQ_BLOCKS.
+        Por padrão G contém todas as restrições (imp, exp, bm, bat e dl, igual a X @ A_ub.T - b_ub de linear_model); com blocks = ('bm',) a linha k é igual a ieq_constr(X[k], data). Somente os blocos solicitados são calculados.
+        Cada bloco é calculado com broadcasting sobre (Nbm, Nt), (Nbat, Nt) e (Ndl, Nt) e depois achatado na mesma ordem dos laços de ieq_constr.
+    '''
+
+    # Parâmetros iniciais da VPP
+    M = 100 # Valor provisório de Mimp e Mexp
+    Mimp = M # Provisório
+    Mexp = M # Provisório
+
+    # Decompondo a população em variáveis de decisão, cada uma com eixo inicial de população
+    p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl = decompose_batch(X, data, binarize, layout)
+    n_pop = p_exp.shape[0]
+
+    # Os laços de ieq_constr percorrem (t, i), logo os blocos (n_pop, N, Nt) são transpostos para (n_pop, Nt, N) antes de achatar
+    def t_major(block: np.ndarray)-> np.ndarray:
+        return block.transpose(0, 2, 1).reshape(n_pop, -1)
+
+    G = []
+
+    # Restrições de importação e exportação da VPP, shape (n_pop, Nt)
+    if 'imp' in blocks:
+        G.append(p_imp - (1 - u_exp) * Mimp)
+    if 'exp' in blocks:
+        G.append(p_exp - (1 - u_imp) * Mexp)
+
+    # Restrições das UBTMs: custo, potência mínima, potência máxima, rampa de subida e rampa de descida
+    if 'bm' in blocks:
+        alpha_bm = data['kappa_bm'][:, None] # Variáveis de custo das UBTMs, shape (Nbm, 1)
+        beta_bm = data['kappa_bm_start'][:, None] # Provisório, shape (Nbm, 1)
+        p_bm_min = data['p_bm_min'][:, None] # Potênica Mínima das UBTMs, shape (Nbm, 1)
+        p_bm_max = data['p_bm_max'][:, None] # Potênca máxima das UBTMs, shape (Nbm, 1)
+        p_bm_rup = data['p_bm_rup'][:, None] # Potência de rampa de subida das UBTMs, shape (Nbm, 1)
+        p_bm_rdown = data['p_bm_rdown'][:, None] # Potência de rampa de descida das UBTMs, shape (Nbm, 1)
+        G += [t_major(alpha_bm * p_bm + beta_bm - gamma_bm),
+              t_major(p_bm_min * u_bm - p_bm),
+              t_major(p_bm - p_bm_max * u_bm),
+              t_major(p_bm[:, :, 1:] - p_bm[:, :, :-1] - p_bm_rup),
+              t_major(p_bm[:, :, :-1] - p_bm[:, :, 1:] - p_bm_rdown)]
+
+    # Restrições dos armazenadores: carregamento máximo, descarregamento máximo e simultaneidade
+    if 'bat' in blocks:
+        p_bat_max = data['p_bat_max'][:, None] # Potência máxima dos armazenadores, shape (Nbat, 1)
+        G += [t_major(p_chg - p_bat_max * u_chg),
+              t_major(p_dch - p_bat_max * u_dch),
+              t_major(u_chg + u_dch - 1)]
+
+    # Restrições das cargas despacháveis (laços em (i, t), sem transposição): potência máxima e mínima
+    if 'dl' in blocks:
+        G += [(p_dl - data['p_dl_max'] * u_dl).reshape(n_pop, -1),
+              (data['p_dl_min'] * u_dl - p_dl).reshape(n_pop, -1)]
+
+    return np.concatenate(G, axis = 1)
+
 # Exemplo de uso
 if __name__ == '__main__':
 
     from generator_scenarios import import_scenarios_from_pickle
     from decompose_vetor import decompose
     from vpp_initial_data import vpp_data
+    from vpp_layout import get_layout
     from pathlib import Path
 
     # Obtendo as projeões inicias
     data = vpp_data()
     data['Nt'] = 24
-    Nt = data['Nt']
-    Ndl = data['Ndl']
-    Nbm = data['Nbm']
-    Nbat = data['Nbat']
-
-    # Definindo a quantidade de variáveis reais (Nr) e variáveis inteiras (Ni)
-    # p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Nbat) + (Nt * Ndl)
-    # u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
+    layout = get_layout(data) # Leiaute do vetor x (Nr variáveis reais e Ni inteiras)
 
     # Gerando um população inicial de indivíduos
-    x = np.random.rand(Nr + Ni)
+    x = np.random.rand(layout.n_var)
 
     # Obtendo as projeções a partir de cenários gerados anteriormente
     path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
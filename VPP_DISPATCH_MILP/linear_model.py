@@ -0,0 +1,253 @@
+import numpy as np
+from scipy import sparse
+from vpp_layout import get_layout
+
+'''
+    Este script tem a finalidade de montar, uma única vez por dicionário data, o modelo linear da VPP na forma matricial esparsa, de modo que a função objetivo e as restrições possam ser avaliadas por produtos matriz-vetor (ou entregues a um resolvedor MILP exato).
+
+    - Parâmetros de entrada (data: dict):
+        - (data: dict): Dicionário contendo os parâmetros iniciais e as projeções temporais iniciais da VPP (os mesmos utilizados por obj_function, eq_constr e ieq_constr), inclusive os estados iniciais opcionais u_bm_0 e soc_0.
+
+    - Retorna uma tupla (c, c0, A_ub, b_ub, A_eq, b_eq), onde:
+        - c: Vetor de coeficientes do lucro, shape (Nr + Ni,), tal que obj_function(x, data) = c @ x + c0;
+        - c0: Parcela constante do lucro (custos operacionais das EOs e FVs);
+        - A_ub: Matriz esparsa (CSR) das restrições de desigualdade, A_ub @ x <= b_ub;
+        - b_ub: Vetor do lado direito das restrições de desigualdade;
+        - A_eq: Matriz esparsa (CSR) das restrições de igualdade, A_eq @ x = b_eq;
+        - b_eq: Vetor do lado direito das restrições de igualdade.
+
+    - Ordem das linhas:
+        - A_ub: imp_constr, exp_constr, bm_constr, bat_constr e dl_constr, na mesma ordem (e com os mesmos sinais) dos laços de ieq_constr;
+        - A_eq: pwr_blc_constr, simul_constr e soc_constr, na mesma ordem de eq_constr (incluindo as Nbat linhas nulas ao final de soc_constr).
+
+    - Observação: as restrições são lineares apenas com as variáveis inteiras já binarizadas, portanto, para um vetor x binarizado (como em MyProblem._evaluate) tem-se A_ub @ x - b_ub igual ao vetor completo de ieq_constr e A_eq @ x - b_eq igual a eq_constr. Para uma população X, shape (n_pop, Nr + Ni), G = X @ A_ub.T - b_ub.
+'''
+
+def variable_indices(data: dict)-> dict[str, np.ndarray]:
+
+    # Índices (colunas) de cada variável de decisão no vetor x, na mesma ordem de decompose
+    return get_layout(data).indices()
+
+def linear_model(data: dict)-> tuple:
+
+    # Parâmetros iniciais da VPP
+    Nt = data['Nt'] # Período da simulação
+    Nbm = data['Nbm'] # Quantidade de UBTMs
+    Ndl = data['Ndl'] # Quantidade de cargas despacháveis
+    Nbat = data['Nbat'] # Quantidade de armazenadores
+    M = 100 # Valor provisório de Mimp e Mexp (o mesmo de ieq_constr)
+    Mimp = M # Provisório
+    Mexp = M # Provisório
+    alpha_bm = data['kappa_bm'] # Variáveis de custo das UBTMs
+    beta_bm = data['kappa_bm_start'] # Provisório
+    kappa_bm_start = data['kappa_bm_start'] # Tarifa de custo de partida
+    kappa_bat = data['kappa_bat'] # Tarifa de custo operacional dos armazenadores
+    kappa_pv = data['kappa_pv'] # Tarifa de custo operacional das FVs
+    kappa_wt = data['kappa_wt'] # Tarifa de custo operacional das EOs
+    p_bm_min = data['p_bm_min'] # Potênica Mínima das UBTMs
+    p_bm_max = data['p_bm_max'] # Potênca máxima das UBTMs
+    p_bm_rup = data['p_bm_rup'] # Potência de rampa de subida das UBTMs
+    p_bm_rdown = data['p_bm_rdown'] # Potência de rampa de descida das UBTMs
+    p_bat_max = data['p_bat_max'] # Potência máxima dos armazenadores
+    eta_chg = data['eta_chg'] # Rendimento do carregamento da bateria
+    eta_dch = data['eta_dch'] # Rendimento do descarregamento da bateria
+    p_dl_min = data['p_dl_min'] # Potência mínima das cargas despacháveis, shape (Ndl, Nt)
+    p_dl_max = data['p_dl_max'] # Potência máxima das cargas despacháveis, shape (Ndl, Nt)
+
+    # Projeções iniciais
+    p_wt = data['p_wt'] # Potência das EOs da VPP
+    p_pv = data['p_pv'] # Potência das FVs da VPP
+    p_l = data['p_l'] # Potência das cargas NÃO despacháveis da VPP
+    tau_pld = data['tau_pld'] # Tarifa PLD
+    tau_dist = data['tau_dist'] # Tarifa da distribuidora
+    tau_dl = data['tau_dl'] # Tarifa de compensação de corte de carga
+
+    # Índices das variáveis de decisão no vetor x
+    idx = variable_indices(data)
+    nvars = sum(v.size for v in idx.values())
+
+    # Vetor de coeficientes do lucro: c @ x + c0 = R - (D + Cbm + Cbat + Cdl + Cwt + Cpv)
+    c = np.zeros(nvars)
+    c[idx['p_exp']] = tau_pld # Receita de exportação
+    c[idx['p_imp']] = - tau_dist # Despesa de importação
+    c[idx['gamma_bm']] = - 1.0 # Custo operacional das UBTMs
+    # Custo de partida/parada: soma em t = 1..Nt-1 de (u_bm[i, t] - u_bm[i, t - 1]) * kappa_bm_start[i]
+    t = np.arange(Nt)
+    start_coef = np.float64(t >= 1) - np.float64(t <= Nt - 2) # Coeficiente de u_bm[i, t] na soma das diferenças
+    c[idx['u_bm']] = - kappa_bm_start[:, None] * start_coef
+    c[idx['p_chg']] = - kappa_bat[:, None] # Custo operacional dos armazenadores
+    c[idx['p_dch']] = - kappa_bat[:, None]
+    c[idx['p_dl']] = - tau_dl # Compensação de corte de carga
+    c0 = - (np.sum(kappa_wt @ p_wt) + np.sum(kappa_pv @ p_pv)) # Custos das EOs e FVs
+    # Partida/parada no primeiro instante em relação ao estado anterior (opcional): (u_bm[i, 0] - u_bm_0[i]) * kappa_bm_start[i]
+    if 'u_bm_0' in data:
+        c[idx['u_bm'][:, 0]] -= kappa_bm_start
+        c0 += kappa_bm_start @ data['u_bm_0']
+
+    # Montagem das matrizes no formato de coordenadas (linha, coluna, valor)
+    def assemble(blocks: list, n_rows: int)-> sparse.csr_matrix:
+        rows, cols, vals = [], [], []
+        for r, col, val in blocks:
+            r, col, val = np.broadcast_arrays(r, col, val)
+            rows.append(r.ravel())
+            cols.append(col.ravel())
+            vals.append(np.float64(val).ravel())
+        return sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape = (n_rows, nvars))
+
+    # Linhas em ordem (t, i), como nos laços de ieq_constr: o bloco (N, Nt) de índices é transposto
+    def t_major(rows: np.ndarray)-> np.ndarray:
+        return rows.T
+
+    # Restrições de desigualdade
+    ub_blocks = []
+    b_ub = []
+    row = 0
+
+    # Importação: p_imp[t] - (1 - u_exp[t]) * Mimp <= 0
+    r = row + np.arange(Nt)
+    ub_blocks += [(r, idx['p_imp'], 1.0), (r, idx['u_exp'], Mimp)]
+    b_ub.append(np.full(Nt, Mimp))
+    row += Nt
+
+    # Exportação: p_exp[t] - (1 - u_imp[t]) * Mexp <= 0
+    r = row + np.arange(Nt)
+    ub_blocks += [(r, idx['p_exp'], 1.0), (r, idx['u_imp'], Mexp)]
+    b_ub.append(np.full(Nt, Mexp))
+    row += Nt
+
+    # Custo das UBTMs: alpha[i] * p_bm[i, t] + beta[i] - gamma_bm[i, t] <= 0
+    r = row + t_major(np.arange(Nbm * Nt).reshape((Nt, Nbm)))
+    ub_blocks += [(r, idx['p_bm'], alpha_bm[:, None]), (r, idx['gamma_bm'], - 1.0)]
+    b_ub.append(np.tile(- beta_bm, Nt))
+    row += Nbm * Nt
+
+    # Potência mínima das UBTMs: p_bm_min[i] * u_bm[i, t] - p_bm[i, t] <= 0
+    r = row + t_major(np.arange(Nbm * Nt).reshape((Nt, Nbm)))
+    ub_blocks += [(r, idx['u_bm'], p_bm_min[:, None]), (r, idx['p_bm'], - 1.0)]
+    b_ub.append(np.zeros(Nbm * Nt))
+    row += Nbm * Nt
+
+    # Potência máxima das UBTMs: p_bm[i, t] - p_bm_max[i] * u_bm[i, t] <= 0
+    r = row + t_major(np.arange(Nbm * Nt).reshape((Nt, Nbm)))
+    ub_blocks += [(r, idx['p_bm'], 1.0), (r, idx['u_bm'], - p_bm_max[:, None])]
+    b_ub.append(np.zeros(Nbm * Nt))
+    row += Nbm * Nt
+
+    # Rampa de subida das UBTMs: p_bm[i, t] - p_bm[i, t - 1] <= p_bm_rup[i], t = 1..Nt-1
+    r = row + t_major(np.arange(Nbm * (Nt - 1)).reshape((Nt - 1, Nbm)))
+    ub_blocks += [(r, idx['p_bm'][:, 1:], 1.0), (r, idx['p_bm'][:, :-1], - 1.0)]
+    b_ub.append(np.tile(p_bm_rup, Nt - 1))
+    row += Nbm * (Nt - 1)
+
+    # Rampa de descida das UBTMs: p_bm[i, t - 1] - p_bm[i, t] <= p_bm_rdown[i], t = 1..Nt-1
+    r = row + t_major(np.arange(Nbm * (Nt - 1)).reshape((Nt - 1, Nbm)))
+    ub_blocks += [(r, idx['p_bm'][:, :-1], 1.0), (r, idx['p_bm'][:, 1:], - 1.0)]
+    b_ub.append(np.tile(p_bm_rdown, Nt - 1))
+    row += Nbm * (Nt - 1)
+
+    # Carregamento máximo dos armazenadores: p_chg[i, t] - p_bat_max[i] * u_chg[i, t] <= 0
+    r = row + t_major(np.arange(Nbat * Nt).reshape((Nt, Nbat)))
+    ub_blocks += [(r, idx['p_chg'], 1.0), (r, idx['u_chg'], - p_bat_max[:, None])]
+    b_ub.append(np.zeros(Nbat * Nt))
+    row += Nbat * Nt
+
+    # Descarregamento máximo dos armazenadores: p_dch[i, t] - p_bat_max[i] * u_dch[i, t] <= 0
+    r = row + t_major(np.arange(Nbat * Nt).reshape((Nt, Nbat)))
+    ub_blocks += [(r, idx['p_dch'], 1.0), (r, idx['u_dch'], - p_bat_max[:, None])]
+    b_ub.append(np.zeros(Nbat * Nt))
+    row += Nbat * Nt
+
+    # Simultaneidade dos armazenadores: u_chg[i, t] + u_dch[i, t] <= 1
+    r = row + t_major(np.arange(Nbat * Nt).reshape((Nt, Nbat)))
+    ub_blocks += [(r, idx['u_chg'], 1.0), (r, idx['u_dch'], 1.0)]
+    b_ub.append(np.ones(Nbat * Nt))
+    row += Nbat * Nt
+
+    # Potência máxima das cargas despacháveis (ordem (i, t)): p_dl[i, t] - p_dl_max[i, t] * u_dl[i, t] <= 0
+    r = row + np.arange(Ndl * Nt).reshape((Ndl, Nt))
+    ub_blocks += [(r, idx['p_dl'], 1.0), (r, idx['u_dl'], - p_dl_max)]
+    b_ub.append(np.zeros(Ndl * Nt))
+    row += Ndl * Nt
+
+    # Potência mínima das cargas despacháveis (ordem (i, t)): p_dl_min[i, t] * u_dl[i, t] - p_dl[i, t] <= 0
+    r = row + np.arange(Ndl * Nt).reshape((Ndl, Nt))
+    ub_blocks += [(r, idx['u_dl'], p_dl_min), (r, idx['p_dl'], - 1.0)]
+    b_ub.append(np.zeros(Ndl * Nt))
+    row += Ndl * Nt
+
+    A_ub = assemble(ub_blocks, row)
+    b_ub = np.concatenate(b_ub)
+
+    # Restrições de igualdade
+    eq_blocks = []
+    b_eq = []
+    row = 0
+
+    # Balanço de potência: p_exp + p_bm - p_imp - p_dl - (p_chg - p_dch) = p_l - p_wt - p_pv, em cada instante t
+    r = row + np.arange(Nt)
+    eq_blocks += [(r, idx['p_exp'], 1.0), (r, idx['p_imp'], - 1.0),
+                  (r, idx['p_bm'], 1.0), (r, idx['p_dl'], - 1.0),
+                  (r, idx['p_chg'], - 1.0), (r, idx['p_dch'], 1.0)]
+    b_eq.append(np.sum(p_l, axis = 0) - np.sum(p_wt, axis = 0) - np.sum(p_pv, axis = 0))
+    row += Nt
+
+    # Simultaneidade de importação/exportação: u_exp[t] + u_imp[t] = 1
+    r = row + np.arange(Nt)
+    eq_blocks += [(r, idx['u_exp'], 1.0), (r, idx['u_imp'], 1.0)]
+    b_eq.append(np.ones(Nt))
+    row += Nt
+
+    # Estado de carga: soc[i, t] - soc[i, t - 1] - p_chg[i, t] * eta_chg[i] + p_dch[i, t] / eta_dch[i] = 0, t = 1..Nt-1
+    r = row + t_major(np.arange(Nbat * (Nt - 1)).reshape((Nt - 1, Nbat)))
+    eq_blocks += [(r, idx['soc'][:, 1:], 1.0), (r, idx['soc'][:, :-1], - 1.0),
+                  (r, idx['p_chg'][:, 1:], - eta_chg[:, None]), (r, idx['p_dch'][:, 1:], 1 / eta_dch[:, None])]
+    b_eq.append(np.zeros(Nbat * (Nt - 1)))
+    row += Nbat * (Nt - 1)
+
+    # Estado de carga inicial (opcional): soc[i, 0] - p_chg[i, 0] * eta_chg[i] + p_dch[i, 0] / eta_dch[i] = soc_0[i]
+    # Sem soc_0 as últimas Nbat linhas ficam nulas, como em eq_constr
+    r = row + np.arange(Nbat)
+    if 'soc_0' in data:
+        eq_blocks += [(r, idx['soc'][:, 0], 1.0), (r, idx['p_chg'][:, 0], - eta_chg), (r, idx['p_dch'][:, 0], 1 / eta_dch)]
+        b_eq.append(np.asarray(data['soc_0'], dtype = float))
+    else:
+        b_eq.append(np.zeros(Nbat))
+    row += Nbat
+
+    A_eq = assemble(eq_blocks, row)
+    b_eq = np.concatenate(b_eq)
+
+    return c, c0, A_ub, b_ub, A_eq, b_eq
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from vpp_initial_data import vpp_data
+    from objetive_function import obj_function
+    from eq_constraints import eq_constr
+    from generator_scenarios import import_scenarios_from_pickle
+    from pathlib import Path
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    # Obtendo as projeções temporais iniciais a partir de um cenário gerado anteriormente
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    cenarios = import_scenarios_from_pickle(path)
+    cenario = cenarios[np.random.choice(len(cenarios))]
+    for key in ['p_l', 'p_pv', 'p_wt', 'tau_pld', 'tau_dist', 'tau_dl']:
+        data[key] = cenario[key]
+    data['p_dl_max'] = cenario['p_dl_ref'] * 1.2
+    data['p_dl_min'] = cenario['p_dl_ref'] * 0.8
+
+    # Montando o modelo linear
+    c, c0, A_ub, b_ub, A_eq, b_eq = linear_model(data)
+    print(f'A_ub shape {A_ub.shape} nnz {A_ub.nnz}\nA_eq shape {A_eq.shape} nnz {A_eq.nnz}\n')
+
+    # Comparando com as funções originais para um vetor x com as variáveis inteiras binarizadas
+    idx = variable_indices(data)
+    x = np.random.rand(c.size)
+    x[idx['u_exp'][0]:] = np.float64(x[idx['u_exp'][0]:] > 0.5)
+
+    print(f'Diferença na função objetivo: {abs(c @ x + c0 - obj_function(x, data)):.2e}')
+    print(f'Diferença nas restrições de igualdade: {np.max(np.abs(A_eq @ x - b_eq - eq_constr(x, data))):.2e}')
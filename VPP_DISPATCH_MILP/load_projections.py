@@ -116,13 +116,14 @@
 
 #     return p_l, p_pv, p_wt, p_dl_ref, p_dl_min, p_dl_max, tau_pld, tau_dist, tau_dl
 
-from pathlib import Path
-import pandas as pd
+from series_store import load_series
 import numpy as np
 
 '''
     Este script tem a finalidade de carregar as projeções temporais iniciais da VPP geradas por geradores de séries temporais.
 
+    As séries são convertidas uma única vez para o armazenamento binário de series_store (GENERATED_SERIES/*.npy) e cada chamada apenas fatia os arrays mapeados em memória, sem reler as planilhas.
+
     - Parâmetros de entrada (data: dict):
         - data: Dicionário contendo o parâmetros iniciais da VPP
             - Nt: Período de simulação da VPP;
@@ -146,77 +147,40 @@ import numpy as np
 
 def projections(data: dict, begin: int, end: int, idx)-> tuple[np.ndarray]:
 
-    # Obtendo a pasta mãe
-    path = Path(__file__).parent.parent
-
     # Obtendo os parâmetros iniciais da VPP
-    Nt = data['Nt']
     Nl = data['Nl']
     Ndl = data['Ndl']
     Npv = data['Npv']
     Nwt = data['Nwt']
 
-    # Carregamento das projeções das cargas NÃO despacháveis
-    path_1 = path / 'GENERATED_SERIES' / 'load_hourly_series.xlsx' # Caminho das cargas NÃO despacháveis
-    files = pd.ExcelFile(path_1) # Abas presentes no arquivo .xlsx
-    p_l = np.zeros((Nl, Nt)) # Iniciando a variável de potência das cargas NÃO despacháveis
-
-    # Iterando sobre as abas do arquivo .xlsx
-    for i, sheet in enumerate(files.sheet_names):
-
-        load_hourly_series = pd.read_excel(path_1, header = None, sheet_name = sheet)
-        p_l[i, :] = load_hourly_series.iloc[idx, begin: end].values
-
-    # Carregamento das projeções das cargas despacháveis
-    path_2 = path / 'GENERATED_SERIES' / 'dload_hourly_series.xlsx' # Caminho das cargas despacháveis
-    files = pd.ExcelFile(path_2) # Abas presentes no arquivo .xlsx
-    p_dl_ref = np.zeros((Ndl, Nt)) # Iniciando a variável de potência das cargas despacháveis
+    # As séries são lidas do armazenamento binário mapeado em memória (series_store), shape (abas, anos, horas)
+    # Projeções das cargas NÃO despacháveis (uma aba por carga)
+    p_l = np.array(load_series('load_hourly_series')[: Nl, idx, begin: end])
 
-    # Iterando sobre as abas do arquivo .xlsx
-    for i, sheet in enumerate(files.sheet_names):
+    # Projeções das cargas despacháveis
+    p_dl_ref = np.array(load_series('dload_hourly_series')[: Ndl, idx, begin: end])
 
-        dload_hourly_series = pd.read_excel(path_2, header = None, sheet_name = sheet)
-        p_dl_ref[i, :] = dload_hourly_series.iloc[idx, begin: end].values
+    # Projeções das usinas solares (FVs)
+    # p_pv = np.array(load_series('PVsystem_hourly_series')[: Npv, idx, begin: end])
 
-    # Carregamento das projeções das usinas solares (FVs)
-    # path_3 = path / 'GENERATED_SERIES' / 'PVsystem_hourly_series.xlsx' # Caminho do arquivo das projeções das FVs
+    # Projeções das usinas solares calculadas pelo PVGIS
+    p_pv = np.array(load_series('PVGISSystem_hourly_series')[: Npv, idx, begin: end])
 
-    # Carregamento das projeções das usinas solares calculadas pelo PVGIS 
-    path_3 = path / 'GENERATED_SERIES' / 'PVGISSystem_hourly_series.xlsx' # Caminho do arquivo das projeções das FVs
-    files = pd.ExcelFile(path_3) # Abas presentes no arquivo .xlsx
-    p_pv = np.zeros((Npv, Nt)) # Iniciando a variável de potência das FVs
-
-    # Iterando sobre as abas do arquivo .xlsx
-    for i, sheet in enumerate(files.sheet_names):
-
-        PVsystem_hourly_series = pd.read_excel(path_3, header = None, sheet_name = sheet)
-        p_pv[i, :] = PVsystem_hourly_series.iloc[idx, begin: end].values
-
-    # Carregamento das projeções das usinas eólicas (EOs)
-    path_4 = path / 'GENERATED_SERIES' / 'WTGsystem_hourly_series.xlsx' # Caminho do arquivo das projeções das EOs
-    files = pd.ExcelFile(path_4)  # Abas presentes no arquivo .xlsx
-    p_wt = np.zeros((Nwt, Nt)) # Iniciando a variável de potência das EOs
-
-    # Iterando sobre as abas do arquivo .xlsx
-    for i, sheet in enumerate(files.sheet_names):
-               
-        WTGsystem_hourly_series = pd.read_excel(path_4, header = None, sheet_name = sheet)
-        p_wt[i, :] = WTGsystem_hourly_series.iloc[idx, begin: end].values
+    # Projeções das usinas eólicas (EOs)
+    p_wt = np.array(load_series('WTGsystem_hourly_series')[: Nwt, idx, begin: end])
 
-    # Carregamento do Preço de Liquidação de Diferenças (PLD)
-    path_5 = path / 'GENERATED_SERIES' / 'PLD_hourly_series.csv' # Caminho da projeção de PLD
-    PLD_hourly_series = pd.read_csv(path_5, sep = ';', header = None)
+    # Preço de Liquidação de Diferenças (PLD), sorteando uma das séries
+    PLD_hourly_series = load_series('PLD_hourly_series')[0]
     m, _ = PLD_hourly_series.shape
     i = np.random.choice(m)
-    tau_pld = PLD_hourly_series.iloc[i, begin: end].to_numpy() # Inciando a variável de tarifa PLD
+    tau_pld = np.array(PLD_hourly_series[i, begin: end]) # Inciando a variável de tarifa PLD
 
-    # Carregamento das projeções de tarifa da distribuidora
-    path_6 = path / 'GENERATED_SERIES' / 'TDist_hourly_series.csv' # Caminho da projeção de tarifa da distribuidora
-    TDist_hourly_series = pd.read_csv(path_6, sep = ';', header = None)
+    # Tarifa da distribuidora, sorteando uma das séries
+    TDist_hourly_series = load_series('TDist_hourly_series')[0]
     m, _ = TDist_hourly_series.shape
     i = np.random.choice(m)
-    tau_dist = TDist_hourly_series.iloc[i, begin: end].to_numpy() # Iniciando a variável de tarifa da distribuidora
-    tau_dl = 0.15 * TDist_hourly_series.iloc[i, begin: end].to_numpy() # Abatimento de 15% sobre o valor da tarifa
+    tau_dist = np.array(TDist_hourly_series[i, begin: end]) # Iniciando a variável de tarifa da distribuidora
+    tau_dl = 0.15 * TDist_hourly_series[i, begin: end] # Abatimento de 15% sobre o valor da tarifa
 
     return p_l, p_pv, p_wt, p_dl_ref, tau_pld, tau_dist, tau_dl
 
@@ -1,5 +1,6 @@
 import numpy as np
-from decompose_vetor import decompose
+from decompose_vetor import decompose, decompose_batch
+from vpp_layout import VPPLayout
 
 """
     Este script tem a finalidade de, a partir dos parâmetros de entrada, das projeções iniciais e das variáveis de decisão, calcular uma função de lucro. Dessa forma, a função será fornecida a um otimizador para que o mesmo encontre a solução ótima, onde a VPP forneça uma maior margen de lucro.
@@ -15,6 +16,7 @@ from decompose_vetor import decompose
                     - Nbat: Quantidade de armazenadores da VPP;
                     - kappa_bm: Tarifa de custo operacional das UBTMs;
                     - kappa_bm_start: Tarifa de custo de partida/parada das UBTMs;
+                    - u_bm_0 (opcional): Estado das UBTMs antes do início da simulação, shape (Nbm,), que adiciona a partida/parada do primeiro instante;
                     - kappa_pv: Tarifa de custo operacioanl das FVs;
                     - kappa_wt: Tarifa de custo operacional das EOs;
                     - kappa_bat: Tarifa de custo operacional dos armazenadores;
@@ -93,6 +95,12 @@ def obj_function(x: np.ndarray, data: dict)-> np.float64:
         for i in range(Nbm):
             Cbm += (u_bm[i, t] - u_bm[i, t - 1]) * kappa_bm_start[i]
 
+    # Partida/parada no primeiro instante em relação ao estado anterior à simulação (opcional, ex.: horizonte rolante)
+    if 'u_bm_0' in data:
+        u_bm_0 = data['u_bm_0'] # Estado das UBTMs antes do início da simulação, shape (Nbm,)
+        for i in range(Nbm):
+            Cbm += (u_bm[i, 0] - u_bm_0[i]) * kappa_bm_start[i]
+
     # Variável de custo dos armazenadores
     Cbat = 0
     # Cálculo do custo operacional dos armazenadores
@@ -130,10 +138,62 @@ def obj_function(x: np.ndarray, data: dict)-> np.float64:
 
     return fval
 
+def obj_function_batch(X: np.ndarray, data: dict, binarize: bool = True, layout: VPPLayout = None)-> np.ndarray:
+    '''
+        Versão populacional de obj_function: recebe uma matriz X, shape (n_pop, Nr + Ni), e retorna o lucro de todos os indivíduos, shape (n_pop,), com as mesmas parcelas de receita e custo de obj_function calculadas por reduções do NumPy.
+    '''
+
+    # Parametros iniciais da VPP
+    tau_pld = data['tau_pld'] # Tarifa PLD (Preço de Liquidação de Diferença), shape (Nt,)
+    tau_dist = data['tau_dist'] # Tarifa da distribuidora, shape (Nt,)
+    kappa_bm_start = data['kappa_bm_start'] # Tarifa de custo de partida, shape (Nbm,)
+    kappa_bat = data['kappa_bat'] # Tarifa de custo operacional dos armazenadores, shape (Nbat,)
+    tau_dl = data['tau_dl'] # Tarifa de compensação de corte de carga, shape (Nt,)
+    kappa_pv = data['kappa_pv'] # Tarifa de custo operacional das FVs, shape (Npv,)
+    kappa_wt = data['kappa_wt'] # Tarifa de custo operacional das EOs, shape (Nwt,)
+
+    # Projeções iniciais
+    p_pv = data['p_pv'] # Potência das usinas solares (FVs) VPP
+    p_wt = data['p_wt'] # Potênica das usinas eólicas (EOs) VPP
+
+    # Decompondo a matriz X em variáveis de decisão com eixo de população
+    p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl = decompose_batch(X, data, binarize, layout)
+
+    # Receita gerada pela VPP (R), shape (n_pop,)
+    R = p_exp @ tau_pld
+
+    # Despesa com a importação de energia junto a distribuidora (D), shape (n_pop,)
+    D = p_imp @ tau_dist
+
+    # Custo operacional e de partida/parada das UBTMs
+    Cbm = np.sum(gamma_bm, axis = (1, 2))
+    Cbm += np.sum(np.diff(u_bm, axis = 2), axis = 2) @ kappa_bm_start
+    if 'u_bm_0' in data:
+        Cbm += (u_bm[:, :, 0] - data['u_bm_0']) @ kappa_bm_start # Partida/parada em relação ao estado anterior à simulação
+
+    # Custo operacional dos armazenadores
+    Cbat = np.sum(p_chg + p_dch, axis = 2) @ kappa_bat
+
+    # Compensação de corte de carga da VPP
+    Cdl = np.sum(p_dl @ tau_dl, axis = 1)
+
+    # Custos operacionais das usinas EOs e FVs (não dependem das variáveis de decisão)
+    Cwt = np.sum(kappa_wt @ p_wt)
+    Cpv = np.sum(kappa_pv @ p_pv)
+
+    # Cálculo do custo total da VPP
+    D = D + (Cbm + Cbat + Cdl + Cwt + Cpv)
+
+    # Vetor de lucro da VPP, shape (n_pop,)
+    fval = R - D
+
+    return fval
+
 # Exemplo de uso
 if __name__ == '__main__':
 
     from vpp_initial_data import vpp_data
+    from vpp_layout import get_layout
     from decompose_vetor import decompose
     from generator_scenarios import import_scenarios_from_pickle
     from pathlib import Path
@@ -142,19 +202,10 @@ if __name__ == '__main__':
 
     # Parâmetros iniciais de VPP
     data['Nt'] = 24
-    Nt = data['Nt'] # Período de simulação da VPP
-    Nbm = data['Nbm'] # Quantidade de usinas de biomassa da VPP
-    Nbat = data['Nbat'] # Quantidade de armazenadores da VPP
-    Ndl = data['Ndl'] # Quantidade de cargas despacháveis da VPP
+    layout = get_layout(data) # Leiaute do vetor x (Nr variáveis reais e Ni inteiras)
 
-    # Definindo a quantidade de variáveis reais (Nr) e variáveis inteiras (Ni)
-    # Variáveis reais: p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Ndl)
-    # Variáveis inteiras: u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
-    
     # Gerando um população inicial para teste
-    x = np.random.rand(Nr + Ni)
+    x = np.random.rand(layout.n_var)
 
     # Obtendo as projeções temporais iniciais a partir de um cenário gerado anteriormente
     path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
@@ -1,12 +1,16 @@
-from pymoo.core.problem import ElementwiseProblem
+from pymoo.core.problem import Problem
 from pymoo.algorithms.soo.nonconvex.ga import GA
-from objetive_function import obj_function
+from objetive_function import obj_function_batch
 from decompose_vetor import decompose
-from ieq_constraints import ieq_constr
+from ieq_constraints import ieq_constr_batch
 from eq_constraints import eq_constr
 from get_limits import bounds
+from vpp_layout import get_layout
+from ga_repair import VPPRepair
 import numpy as np
 from pymoo.optimize import minimize
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 
 from pymoo.config import Config
 Config.warnings['not_compiled'] = False
@@ -14,7 +18,7 @@ Config.warnings['not_compiled'] = False
 '''
     Este script tem a finalidade de construir um otimizador (GA) para encontrar soluções ótimas (maximizar o lucro) de uma função objetivo de VPP.
         
-        - Parâmetros de entrada (data: dict):
+        - Parâmetros de entrada (data: dict, n_workers: int, seed: int, verbose: bool, X0: np.ndarray, n_gen: int, pop_size: int, profiler: GAProfiler, repair: bool):
             - data: Dicionário contendo os parâmetros inciais e as projeções temporais iniciais;
 
                 - Projeções iniciais:
@@ -23,62 +27,98 @@ Config.warnings['not_compiled'] = False
                     - Nbm: Quantidade de UBTMs da VPP;
                     - Nbat: Quantidade de armazenadores da VPP;
 
+            - n_workers: Quantidade de processos usados na avaliação da população (1 para avaliação serial no processo principal). O dicionário data é enviado a cada processo uma única vez, pelo initializer do pool, e a cada geração cada processo avalia um bloco de indivíduos.
+              A avaliação vetorizada (obj_function_batch e ieq_constr_batch) custa da mesma ordem que serializar os blocos para os processos, portanto o pool só compensa quando a avaliação é cara (ex.: funções objetivo ou restrições não vetorizadas); com as funções atuais n_workers = 1 costuma ser o mais rápido. Meça na máquina de destino com benchmark.py (varredura WORKERS) antes de usar n_workers > 1;
+            - seed: Semente do gerador aleatório do GA (a mesma semente reproduz a mesma solução);
+            - verbose: Exibe a tabela de gerações do pymoo;
+            - X0: Solução(ões) inicial(is) para partida a quente, shape (Nr + Ni,) ou (n, Nr + Ni), ex.: a solução da janela anterior deslocada no horizonte rolante. Os demais indivíduos da população inicial são sorteados entre lb e ub (None para a amostragem padrão do GA);
+            - n_gen: Quantidade de gerações do GA;
+            - pop_size: Tamanho da população do GA;
+            - profiler: Instrumentação opcional (ga_profiler.GAProfiler), cujo gancho timer cronometra as etapas de MyProblem._evaluate (binarização, obj_function, ieq_constr e pool) e que registra por geração esses tempos, as avaliações, o melhor e o médio valor da função objetivo, a fração factível e a violação das restrições (None desativa);
+            - repair: Repara a população antes de cada avaliação (ga_repair.VPPRepair): binários, exclusividade de importação/exportação e de carga/descarga, limites de p_bm ligados a u_bm, custo gamma_bm e integração do estado de carga;
+
         - Retorna:
             - res: Objeto com os resultados da otimização (solução ótima, histórico, etc.)
 '''
 
-def solver(data: dict):
-
-    # Parâmetros iniciais da VPP
-    Nt = data['Nt'] # Períod ad simulação da VPP
-    Ndl = data['Ndl'] # Quantida de cargas despacháveis da VPP
-    Nbm = data['Nbm'] # Quantidade de UBTMs da VPP
-    Nbat = data['Nbat'] # Quantidade de armazenadores da VPP
-
-    # Variáveis reais: p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl
-    Nr = Nt + Nt + (Nt * Nbm) + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nbat * Nt) + (Nt * Ndl)
-    # Variáveis inteiras: u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
-    Ni = Nt + Nt + (Nt * Nbm) + (Nt * Nbat) + (Nt * Nbat) + (Nt * Ndl)
-    # Definido a quantidade de variáveis
-    nvars = Nr + Ni
-
-    # Definindo a quantidade de restrições de igualdade da VPP
-    Npbc = Nt # quantidade de restrições de igualdade do balanço de potência da VPP
-    Nsimc = Nt # Quantidade de restrição igualdade de simultaneidade VPP
-    Nsoc = (Nbat * Nt) # Quantidade restrições de igualdade do estado de carga dos armazenadores da VPP
-    c_eq = Npbc + Nsimc + Nsoc # Total de restrições de igualdade da VPP 
-
-    # Definindo a quantidade de restrições de desigualdades da VPP
-    Nimpc = Nt # Quantidade de restrições de desigualdade de importação da VPP
-    Nexpc = Nt # Quantidade de restrições de desigualdade de exportação da VPP
-    Nbmc = (Nbm * Nt) + (Nbm * Nt) + (Nbm * Nt) + (Nbm * (Nt - 1)) + (Nbm * (Nt - 1)) # Quantidade de restrições de desigualdade da VPP
-    Nbatc = (Nbat * Nt) + (Nbat * Nt) + (Nbat * Nt) # Quantidade de restrições de desigualdade dos armazenadores da VPP
-    Ndlc = (Ndl * Nt) + (Ndl * Nt) # Quantidade de restrições de desigualdade das cargas despacháveis da VPP
-    c_ieq =  Nbmc # Total de restrições de desigualdade da VPP 
+# Blocos de restrições de desigualdade avaliados pelo GA (ver ieq_constraints.IEQ_BLOCKS)
+GA_IEQ_BLOCKS = ('bm',)
 
-    # Obtendo os limites superior (ub) e inferior (lb) das variáveis de decisão
-    ub, lb = bounds(data)
+# Gancho de cronometragem padrão (sem profiler): não mede nada
+def _no_timer(name: str):
+    return nullcontext()
 
-    # Criando uma classe que define o problema
-    class MyProblem(ElementwiseProblem):
+# Dicionário data de cada processo do pool, definido uma única vez por _init_worker
+_worker_data = None
 
-        def __init__(self, data: dict, **kwargs):
-            super().__init__(data, **kwargs)
-            self.data = data # Atribuindo o dicionário data a classe
+def _init_worker(data: dict)-> None:
+    global _worker_data
+    _worker_data = data
+
+# Avaliação de um bloco de indivíduos (já binarizados) em um processo do pool
+def _evaluate_chunk(X: np.ndarray)-> tuple[np.ndarray]:
+    F = - obj_function_batch(X, _worker_data, binarize = False) # Maximização
+    G = ieq_constr_batch(X, _worker_data, binarize = False, blocks = GA_IEQ_BLOCKS) # Inequality Constraints
+    return F, G
+
+def solver(data: dict, n_workers: int = 1, seed: int = 1, verbose: bool = True, X0: np.ndarray = None, n_gen: int = 200, pop_size: int = 250, profiler = None, repair: bool = False):
 
-        def _evaluate(self, x, out, *args, **kwargs):
+    # Leiaute do vetor x e das restrições, calculado uma única vez por dimensão da VPP
+    layout = get_layout(data)
+    Nr = layout.Nr # Variáveis reais: p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl
+    Ni = layout.Ni # Variáveis inteiras: u_exp, u_imp, u_bm, u_chg, u_dch, u_dl
+    nvars = layout.n_var # Quantidade de variáveis
 
-            xr = x[0: Nr]
-            xi = x[Nr: Nr + Ni]
-            xi = np.float64(xi > 0.5) # Binarizando
-            x = np.concatenate((xr, xi)) # Reagrupando
+    # c_eq = layout.n_eq # Total de restrições de igualdade da VPP
+    c_ieq = sum(layout.ieq_rows[name].stop - layout.ieq_rows[name].start for name in GA_IEQ_BLOCKS) # Restrições de desigualdade avaliadas pelo GA (UBTMs)
 
-            out['F'] = - obj_function(x, self.data) # Maximização
-            out['G'] = ieq_constr(x, self.data) # Inequality Constraints
-            # out['H'] = eq_constr(x, self.data) # Equality Constraints
+    # Obtendo os limites superior (ub) e inferior (lb) das variáveis de decisão
+    ub, lb = bounds(data, layout)
+
+    # Criando uma classe que define o problema
+    # O problema é avaliado por população (Problem) e não por indivíduo (ElementwiseProblem)
+    class MyProblem(Problem):
+
+        def __init__(self, data: dict, pool: ProcessPoolExecutor = None, timer = None, **kwargs):
+            super().__init__(**kwargs)
+            self.data = data # Atribuindo o dicionário data a classe
+            self.pool = pool # Pool de processos (None para avaliação serial)
+            self.timer = _no_timer if timer is None else timer # Gancho timer(etapa) que cronometra cada etapa da avaliação (ex.: GAProfiler.timer)
+
+        def _evaluate(self, X, out, *args, **kwargs):
+
+            timer = self.timer
+
+            # Binarizando uma única vez por avaliação (as funções abaixo recebem binarize = False)
+            with timer('binarize'):
+                Xb = np.empty_like(X)
+                Xb[:, 0: Nr] = X[:, 0: Nr]
+                np.greater(X[:, Nr: Nr + Ni], 0.5, out = Xb[:, Nr: Nr + Ni], casting = 'unsafe')
+                X = Xb
+
+            if self.pool is None:
+                with timer('obj_function'):
+                    out['F'] = - obj_function_batch(X, self.data, binarize = False, layout = layout) # Maximização, shape (n_pop,)
+                with timer('ieq_constr'):
+                    out['G'] = ieq_constr_batch(X, self.data, binarize = False, layout = layout, blocks = GA_IEQ_BLOCKS) # Inequality Constraints, shape (n_pop, c_ieq)
+            else:
+                # Dividindo a população em um bloco por processo e reagrupando os resultados na mesma ordem
+                with timer('pool'):
+                    chunks = np.array_split(X, n_workers)
+                    results = list(self.pool.map(_evaluate_chunk, chunks))
+                out['F'] = np.concatenate([F for F, G in results])
+                out['G'] = np.concatenate([G for F, G in results])
+            # out['H'] = np.array([eq_constr(x, self.data) for x in X]) # Equality Constraints
+
+    # Criando o pool de processos, caso solicitado
+    pool = None
+    if n_workers > 1:
+        pool = ProcessPoolExecutor(max_workers = n_workers, initializer = _init_worker, initargs = (data,))
 
     # Instanciando a classe problema
     problem = MyProblem(data,
+                        pool = pool,
+                        timer = profiler.timer if profiler is not None else None,
                         n_obj = 1,
                         n_var = nvars,
                         # n_eq_constr = c_eq,
@@ -89,26 +129,43 @@ def solver(data: dict):
     from pymoo.operators.crossover.sbx import SimulatedBinaryCrossover
     from pymoo.operators.mutation.pm import PolynomialMutation
     from pymoo.operators.sampling.lhs import LatinHypercubeSampling
+    from pymoo.operators.sampling.rnd import FloatRandomSampling
     from pymoo.operators.selection.rnd import RandomSelection
 
     crossover = SimulatedBinaryCrossover(prob_var = 0.75, eta = 15, prob_bin = 0.35, prob_exch = 0.9, n_offsprings = 1)
     mutation = PolynomialMutation(prob = 0.15, eta = 20)
-    sampling = LatinHypercubeSampling()
+    # sampling = LatinHypercubeSampling()
+    sampling = FloatRandomSampling() # Amostragem padrão do GA
     selection = RandomSelection()
 
+    # Partida a quente: a população inicial contém X0 e é completada com indivíduos aleatórios entre lb e ub
+    if X0 is not None:
+        X0 = np.clip(np.atleast_2d(X0)[: pop_size], lb, ub) # Mantendo a solução inicial dentro dos limites da janela atual
+        rng = np.random.default_rng(seed)
+        sampling = np.vstack((X0, lb + rng.random((pop_size - X0.shape[0], nvars)) * (ub - lb)))
+
     # Definindo o algoritmo 
     algorithm = GA(
-        pop_size = 250,
+        pop_size = pop_size,
         crossover = crossover,
         mutation = mutation,
         eliminate_duplicates = True,
-        # sampling = sampling,
-        selection = selection 
+        sampling = sampling,
+        selection = selection,
+        repair = VPPRepair(data, layout) if repair else None
         )
-    termination = ('n_gen', 200)
+    termination = ('n_gen', n_gen)
 
     # Obtendo a solução
-    res = minimize(problem, algorithm, termination, verbose = True, seed = 1)
+    try:
+        # Com profiler, cada geração é registrada pelo callback
+        kwargs = {'callback': profiler} if profiler is not None else {} # Sem profiler, o pymoo mantém o callback padrão
+        if profiler is not None:
+            profiler.start()
+        res = minimize(problem, algorithm, termination, verbose = verbose, seed = seed, **kwargs)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     # MODELO FEITO COM PENALIDADES NAS RESTRIÇÕES
     # from pymoo.constraints.as_penalty import ConstraintsAsPenalty
@@ -0,0 +1,105 @@
+from scipy.optimize import milp, LinearConstraint, Bounds
+from pymoo.core.result import Result
+from objetive_function import obj_function
+from ieq_constraints import ieq_constr
+from eq_constraints import eq_constr
+from linear_model import linear_model
+from get_limits import bounds
+from vpp_layout import get_layout
+import numpy as np
+import time
+
+'''
+    Este script tem a finalidade de resolver o despacho da VPP de forma exata, como um problema de Programação Linear Inteira Mista (MILP), utilizando o resolvedor HiGHS disponível no SciPy (scipy.optimize.milp), como alternativa ao otimizador GA.
+
+        - Parâmetros de entrada (data: dict, time_limit: float):
+            - data: Dicionário contendo os parâmetros inciais e as projeções temporais iniciais (o mesmo fornecido a solver de optimazer_GA);
+            - time_limit: Tempo máximo de execução do resolvedor em segundos (None para sem limite);
+
+        - Retorna:
+            - res: Objeto com os resultados da otimização com os mesmos campos consumidos de optimazer_GA.solver:
+                - X: Vetor de variáveis de decisão ótimo (p_exp ... u_dl), com as variáveis inteiras binárias;
+                - F: Valor da função objetivo (lucro com sinal negativo, como no GA), shape (1,);
+                - G: Restrições de desigualdade de ieq_constr na solução;
+                - H: Restrições de igualdade de eq_constr na solução;
+                - CV: Violação total das restrições na solução;
+              Caso o resolvedor não encontre solução viável, X, F, G e H são None e res.message contém o motivo.
+'''
+
+def solver_milp(data: dict, time_limit: float = None):
+
+    # Montando o modelo linear esparso: lucro = c @ x + c0, A_ub @ x <= b_ub e A_eq @ x = b_eq
+    c, c0, A_ub, b_ub, A_eq, b_eq = linear_model(data)
+    nvars = c.size
+
+    # Quantidade de variáveis reais (p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl)
+    layout = get_layout(data)
+    Nr = layout.Nr
+
+    # Obtendo os limites superior (ub) e inferior (lb) das variáveis de decisão
+    ub, lb = bounds(data, layout)
+
+    # Variáveis reais são contínuas (0) e as variáveis de estado (u_exp ... u_dl) são inteiras (1) entre 0 e 1
+    integrality = np.zeros(nvars)
+    integrality[Nr:] = 1
+
+    constraints = [LinearConstraint(A_ub, - np.inf, b_ub), # Restrições de desigualdade
+                   LinearConstraint(A_eq, b_eq, b_eq)] # Restrições de igualdade
+
+    options = {'disp': False}
+    if time_limit is not None:
+        options['time_limit'] = time_limit
+
+    # Obtendo a solução (o milp minimiza, logo o lucro entra com sinal negativo)
+    start_time = time.time()
+    sol = milp(- c, constraints = constraints, integrality = integrality, bounds = Bounds(lb, ub), options = options)
+    end_time = time.time()
+
+    # Organizando o resultado nos mesmos campos do resultado do GA
+    res = Result()
+    res.success = sol.success
+    res.message = sol.message
+    res.start_time = start_time
+    res.end_time = end_time
+    res.exec_time = end_time - start_time
+
+    if sol.x is not None:
+        x = sol.x.copy()
+        x[Nr:] = np.round(x[Nr:]) # Eliminando resíduos numéricos das variáveis binárias
+
+        G = ieq_constr(x, data) # Restrições de desigualdade (as mesmas avaliadas pelo GA)
+        H = eq_constr(x, data) # Restrições de igualdade
+
+        res.X = x
+        res.F = np.array([- obj_function(x, data)]) # Maximização, como em optimazer_GA
+        res.G = G
+        res.H = H
+        res.CV = np.array([np.sum(np.maximum(G, 0)) + np.sum(np.abs(H))])
+
+    return res
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from vpp_initial_data import vpp_data
+    from generator_scenarios import import_scenarios_from_pickle
+    from pathlib import Path
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    # Obtendo as projeções temporais iniciais a partir de um cenário gerado anteriormente
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    cenarios = import_scenarios_from_pickle(path)
+    cenario = cenarios[np.random.choice(len(cenarios))]
+    for key in ['p_l', 'p_pv', 'p_wt', 'p_dl_ref', 'tau_pld', 'tau_dist', 'tau_dl']:
+        data[key] = cenario[key]
+    data['p_dl_max'] = data['p_dl_ref'] * 1.2
+    data['p_dl_min'] = data['p_dl_ref'] * 0.8
+
+    # Teste
+    res = solver_milp(data)
+
+    print(f'{res.message}\nTempo de execução: {res.exec_time:.3f} s\n')
+    if res.X is not None:
+        print(f'O lucro dessa simulação foi de aproximadamente {- res.F[0]:.2f}\n')
@@ -0,0 +1,148 @@
+from generator_scenarios import apply_scenario
+from decompose_vetor import decompose, compose
+from vpp_layout import VARIABLES
+from objetive_function import obj_function
+from linear_model import variable_indices
+from load_projections import projections
+from optimazer_GA import solver
+from optimazer_MILP import solver_milp
+import numpy as np
+import time
+
+'''
+    Este script tem a finalidade de despachar a VPP em horizonte rolante: a cada passo (step horas) a VPP é re-despachada sobre uma janela de horizon horas (ex.: 24 a 48 h), somente as primeiras step horas da solução são executadas e a janela avança, percorrendo um ano inteiro de projeções.
+
+        - As projeções do ano são carregadas uma única vez (load_year) e cada janela é apenas uma fatia delas;
+        - O estado ao fim das horas executadas é transportado para a janela seguinte pelas chaves opcionais de data:
+            - soc_0: Estado de carga dos armazenadores (restrição de igualdade do SoC no primeiro instante, eq_constr/linear_model);
+            - u_bm_0: Estado das UBTMs (custo de partida/parada no primeiro instante, obj_function/linear_model);
+            - p_bm_0: Potência das UBTMs (rampa no primeiro instante, get_limits.bounds);
+        - No GA a população é sempre reparada (ga_repair.VPPRepair), pois o GA não avalia as restrições de igualdade e o SoC da janela só parte de soc_0 pela integração do reparo;
+        - Partida a quente: no GA a solução da janela anterior, deslocada de step horas (shift_solution), entra na população inicial (X0), o que permite reduzir a quantidade de gerações (n_gen). O scipy.optimize.milp não aceita solução inicial, portanto no MILP a partida a quente se limita ao estado transportado;
+        - A latência de cada passo (montagem + solução) é registrada.
+
+    - Parâmetros de entrada (data: dict, year: dict, horizon: int, step: int, n_steps: int, method: str, delta: float, seed: int, n_gen: int, time_limit: float, verbose: bool):
+        - data: Dicionário contendo os parâmetros iniciais da VPP;
+        - year: Projeções do ano inteiro, obtidas por load_year;
+        - horizon: Tamanho da janela de otimização em horas;
+        - step: Horas executadas a cada passo (avanço da janela);
+        - n_steps: Quantidade de passos (None para percorrer todo o ano);
+        - method: Otimizador utilizado, 'GA' ou 'MILP';
+        - delta: Limite de corte de carga (fração acima e abaixo da referência);
+        - seed: Semente do GA;
+        - n_gen: Quantidade de gerações do GA em cada passo;
+        - time_limit: Tempo máximo do MILP em cada passo em segundos (None para sem limite);
+        - verbose: Exibe o resumo de cada passo;
+
+    - Retorna um dicionário com:
+        - dispatch: Variáveis de decisão executadas (p_exp ... u_dl), com n_steps * step instantes (NaN nos passos sem solução);
+        - profit: Lucro das horas executadas em cada passo, shape (n_steps,);
+        - latency: Tempo de cada passo em segundos, shape (n_steps,);
+        - status: Situação de cada passo ('ok' ou 'infeasible').
+'''
+
+# Projeções temporais do ano inteiro (linha idx das séries geradas), carregadas uma única vez
+def load_year(data: dict, idx: int, Npoints: int = 8760)-> dict[str, np.ndarray]:
+
+    p_l, p_pv, p_wt, p_dl_ref, tau_pld, tau_dist, tau_dl = projections(dict(data, Nt = Npoints), 0, Npoints, idx)
+
+    return {'p_l': p_l, 'p_pv': p_pv, 'p_wt': p_wt, 'p_dl_ref': p_dl_ref, 'tau_pld': tau_pld, 'tau_dist': tau_dist, 'tau_dl': tau_dl}
+
+# Fatia [begin, end) das projeções do ano, no formato de um cenário de generator_scenarios
+def year_window(year: dict, begin: int, end: int)-> dict[str, np.ndarray]:
+    return {key: value[..., begin: end] for key, value in year.items()}
+
+# Desloca a solução x de step horas para partida a quente da janela seguinte, repetindo o último instante ao final
+def shift_solution(x: np.ndarray, data: dict, step: int)-> np.ndarray:
+
+    variables = decompose(x, data)
+    shifted = []
+    for var in variables:
+        tail = np.repeat(var[..., -1:], step, axis = -1)
+        shifted.append(np.concatenate((var[..., step:], tail), axis = -1))
+
+    return compose(shifted)
+
+def rolling_horizon(data: dict, year: dict, horizon: int = 24, step: int = 1, n_steps: int = None, method: str = 'MILP', delta: float = 0.2,
+                    seed: int = 1, n_gen: int = 50, time_limit: float = None, verbose: bool = True)-> dict:
+
+    if method not in ['GA', 'MILP']:
+        raise ValueError(f"Otimizador desconhecido: {method}. Utilize 'GA' ou 'MILP'.")
+
+    Npoints = year['tau_pld'].shape[-1] # Quantidade de horas das projeções
+    max_steps = (Npoints - horizon) // step + 1 # Quantidade de janelas completas
+    n_steps = max_steps if n_steps is None else min(n_steps, max_steps)
+
+    # Despacho executado, preenchido passo a passo
+    dispatch = {name: np.full(ix.shape, np.nan) for name, ix in variable_indices(dict(data, Nt = n_steps * step)).items()}
+    profit = np.full(n_steps, np.nan)
+    latency = np.zeros(n_steps)
+    status = []
+
+    state = {} # Estado transportado entre janelas (soc_0, u_bm_0, p_bm_0)
+    X0 = None # Solução deslocada da janela anterior (partida a quente do GA)
+
+    for k in range(n_steps):
+
+        begin = k * step
+        start_time = time.perf_counter()
+
+        # Dados da janela atual com o estado ao fim das horas executadas no passo anterior
+        data_k = apply_scenario(data, year_window(year, begin, begin + horizon), delta)
+        data_k['Nt'] = horizon
+        data_k.update(state)
+
+        if method == 'GA':
+            # O GA não avalia as restrições de igualdade, logo soc_0 só é respeitado com o reparo (integração do SoC a partir de soc_0)
+            res = solver(data_k, seed = seed, verbose = False, X0 = X0, n_gen = n_gen, repair = True)
+        else:
+            res = solver_milp(data_k, time_limit = time_limit)
+
+        latency[k] = time.perf_counter() - start_time
+
+        if res.X is None:
+            # Sem solução: o estado anterior é mantido e a próxima janela parte sem solução inicial
+            status.append('infeasible')
+            X0 = None
+        else:
+            status.append('ok')
+            variables = dict(zip(VARIABLES, decompose(res.X, data_k)))
+
+            # Executando somente as primeiras step horas
+            executed = {name: var[..., :step] for name, var in variables.items()}
+            for name, var in executed.items():
+                dispatch[name][..., begin: begin + step] = var
+
+            # Lucro das horas executadas
+            data_step = apply_scenario(data, year_window(year, begin, begin + step), delta)
+            data_step['Nt'] = step
+            data_step.update(state)
+            profit[k] = obj_function(compose(list(executed.values())), data_step)
+
+            # Estado ao fim das horas executadas
+            state = {'soc_0': variables['soc'][:, step - 1], 'u_bm_0': variables['u_bm'][:, step - 1], 'p_bm_0': variables['p_bm'][:, step - 1]}
+
+            X0 = shift_solution(res.X, data_k, step)
+
+        if verbose:
+            print(f'Passo {k}: horas {begin} a {begin + step - 1}, {status[-1]}, lucro {profit[k]:.2f}, tempo {latency[k]:.3f} s')
+
+    return {'dispatch': dispatch, 'profit': profit, 'latency': latency, 'status': status}
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from vpp_initial_data import vpp_data
+
+    data = vpp_data()
+
+    # Projeções do ano 2013 (linha 0 das séries geradas)
+    year = load_year(data, 0)
+
+    # Uma semana re-despachada a cada hora com janelas de 24 h
+    res = rolling_horizon(data, year, horizon = 24, step = 1, n_steps = 168, method = 'MILP')
+
+    latency = res['latency']
+    print(f"\nPassos com solução: {res['status'].count('ok')} de {len(res['status'])}")
+    print(f"Lucro total executado: {np.nansum(res['profit']):.2f}")
+    print(f'Latência por passo: média {np.mean(latency):.3f} s, máxima {np.max(latency):.3f} s, total {np.sum(latency):.1f} s')
@@ -1,7 +1,8 @@
-from generator_scenarios import import_scenarios_from_pickle
+from generator_scenarios import import_scenarios_from_pickle, save_scenarios_to_bank, import_scenarios_from_bank
 from decompose_vetor import decompose
 from vpp_initial_data import vpp_data
 from optimazer_GA import solver
+from optimazer_MILP import solver_milp
 from vpp_plot import plot
 from pathlib import Path
 import numpy as np
@@ -88,8 +89,11 @@ data['Nt'] = Nt
 Nbm = data['Nbm']
 Nbat = data['Nbat']
 
-path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
-cenarios = import_scenarios_from_pickle(path)
+# Banco de cenários mapeado em memória (criado a partir do arquivo .pkl na primeira execução), somente o cenário sorteado é lido
+path = Path(__file__).parent / 'scenarios_with_PVGIS'
+if not (path / 'index.npy').exists():
+    save_scenarios_to_bank(import_scenarios_from_pickle(path.with_suffix('.pkl')), path)
+cenarios = import_scenarios_from_bank(path)
 idx = np.random.choice(len(cenarios))
 cenario = cenarios[idx]
 
@@ -126,8 +130,18 @@ p_dl_ref = data['p_dl_ref'] * cap_load
 data['p_dl_max'] = data['p_dl_ref'] + data['p_dl_ref'] * delta
 data['p_dl_min'] = data['p_dl_ref'] - data['p_dl_ref'] * delta
 
-# Obtendo a solução do otimizador (GA)
-res = solver(data)
+# Definindo o otimizador
+while True:
+    method = input('Escolha o otimizador (1 para GA ou 2 para MILP) ou tecle enter para GA: ')
+    if method in ['', '1', '2']:
+        break
+    print('Escolha inválida. Digite 1 ou 2.')
+
+# Obtendo a solução do otimizador (GA ou MILP)
+if method == '2':
+    res = solver_milp(data)
+else:
+    res = solver(data)
 
 # Obtendo o vetor de soluções da VPP
 x = res.X # Matriz de soluções ótimas
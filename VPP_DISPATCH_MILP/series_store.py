@@ -0,0 +1,91 @@
+from pathlib import Path
+import pandas as pd
+import numpy as np
+import os
+
+'''
+    Este script tem a finalidade de converter, uma única vez, as séries temporais geradas (GENERATED_SERIES/*.xlsx e *.csv) em arquivos binários .npy, de modo que load_projections obtenha as projeções fatiando arrays mapeados em memória em vez de ler as planilhas a cada chamada.
+
+    - O .npy é gravado em um arquivo temporário e renomeado (os.replace), de modo que processos que reconstroem e mapeiam a mesma série simultaneamente nunca leiam um arquivo incompleto.
+
+    - Formato do armazenamento: um arquivo GENERATED_SERIES/<série>.npy por série, shape (abas, anos, horas), onde:
+        - abas: Uma por aba da planilha .xlsx (ex.: uma por carga ou por usina). Os arquivos .csv possuem uma única aba;
+        - anos: Linhas da planilha (uma por ano/série gerada);
+        - horas: Colunas da planilha (8760 para um ano).
+
+    - Funções:
+        1. [convert_series]: Lê a série de origem (.xlsx ou .csv) e grava o .npy correspondente;
+        2. [load_series]: Retorna a série mapeada em memória (mmap_mode = 'r'). O .npy é (re)criado automaticamente quando não existe ou é mais antigo que o arquivo de origem, e o mapeamento fica em cache no processo (_store), portanto somente a primeira chamada acessa o disco. Um .npy regravado depois no mesmo processo (ex.: após regenerar as planilhas) não é relido: o cache mantém o mapeamento do arquivo anterior até o fim do processo;
+        3. [build_store]: Converte todas as séries de SERIES.
+'''
+
+# Pasta das séries geradas
+path = Path(__file__).parent.parent / 'GENERATED_SERIES'
+
+# Séries disponíveis e o respectivo arquivo de origem
+SERIES = {'load_hourly_series': 'load_hourly_series.xlsx', # Cargas NÃO despacháveis
+          'dload_hourly_series': 'dload_hourly_series.xlsx', # Cargas despacháveis
+          'PVsystem_hourly_series': 'PVsystem_hourly_series.xlsx', # Usinas solares (FVs)
+          'PVGISSystem_hourly_series': 'PVGISSystem_hourly_series.xlsx', # Usinas solares (FVs) calculadas pelo PVGIS
+          'WTGsystem_hourly_series': 'WTGsystem_hourly_series.xlsx', # Usinas eólicas (EOs)
+          'PLD_hourly_series': 'PLD_hourly_series.csv', # Preço de Liquidação de Diferenças (PLD)
+          'TDist_hourly_series': 'TDist_hourly_series.csv'} # Tarifa da distribuidora
+
+# Séries já mapeadas em memória neste processo
+_store = {}
+
+def convert_series(name: str)-> Path:
+
+    source = path / SERIES[name]
+
+    if source.suffix == '.xlsx':
+        # Todas as abas de uma vez, na ordem da planilha
+        sheets = pd.read_excel(source, header = None, sheet_name = None)
+        series = np.stack([sheet.to_numpy(dtype = np.float64) for sheet in sheets.values()])
+    else:
+        series = pd.read_csv(source, sep = ';', header = None).to_numpy(dtype = np.float64)[None, :, :]
+
+    # Gravando em um arquivo temporário e renomeando, pois processos paralelos podem reconstruir a mesma série
+    target = path / f'{name}.npy'
+    temp = target.with_suffix(f'.{os.getpid()}.tmp')
+    with open(temp, 'wb') as file:
+        np.save(file, series)
+    os.replace(temp, target)
+
+    return target
+
+def load_series(name: str)-> np.ndarray:
+
+    if name not in _store:
+
+        source = path / SERIES[name]
+        target = path / f'{name}.npy'
+
+        # (Re)criando o .npy caso não exista ou esteja desatualizado em relação à origem
+        if not target.exists() or target.stat().st_mtime < source.stat().st_mtime:
+            convert_series(name)
+
+        _store[name] = np.load(target, mmap_mode = 'r')
+
+    return _store[name]
+
+def build_store()-> None:
+    for name in SERIES:
+        print(f'{name}: {convert_series(name).name}')
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    import time
+
+    # Conversão de todas as séries
+    start_time = time.time()
+    build_store()
+    print(f'Conversão concluída em {time.time() - start_time:.1f} s\n')
+
+    # Consulta de uma janela de 24 h
+    for name in SERIES:
+        start_time = time.perf_counter()
+        series = load_series(name)
+        window = np.array(series[:, 0, 0: 24])
+        print(f'{name}: shape {series.shape}, janela {window.shape} em {(time.perf_counter() - start_time) * 1e6:.0f} µs')
@@ -0,0 +1,158 @@
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scipy import sparse
+from pymoo.core.result import Result
+from generator_scenarios import apply_scenario
+from objetive_function import obj_function
+from linear_model import linear_model, variable_indices
+from get_limits import bounds
+import numpy as np
+import time
+
+'''
+    Este script tem a finalidade de montar e resolver o despacho estocástico de dois estágios da VPP considerando todos os cenários em um único modelo MILP.
+
+        - Primeiro estágio (decisões compartilhadas por todos os cenários): estados de compromisso u_bm, u_chg e u_dch;
+        - Segundo estágio (decisões de cada cenário): potências (p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl) e os demais estados (u_exp, u_imp, u_dl);
+        - Função objetivo: lucro esperado, isto é, a soma dos lucros de cada cenário (c @ x + c0 de linear_model) ponderada pela probabilidade do cenário;
+        - Restrições: as mesmas de linear_model (ieq_constr e eq_constr) repetidas para cada cenário, com as colunas do primeiro estágio compartilhadas.
+
+    O modelo é montado de forma esparsa reaproveitando as matrizes de linear_model de cada cenário: apenas os índices das colunas são remapeados para o vetor global, de modo que a memória cresce linearmente com a quantidade de cenários.
+
+    - Parâmetros de entrada (data: dict, scenarios: list[dict], probabilities: np.ndarray, delta: float):
+        - data: Dicionário contendo os parâmetros iniciais da VPP (inclusive Nt);
+        - scenarios: Lista de cenários, ex.: import_scenarios_from_pickle;
+        - probabilities: Probabilidade de cada cenário, shape (Ns,) (None para cenários equiprováveis);
+        - delta: Limite de corte de carga (fração acima e abaixo da referência);
+
+    - stochastic_model retorna uma tupla (c, c0, A_ub, b_ub, A_eq, b_eq, ub, lb, integrality, columns), onde columns[s] contém, para cada posição do vetor x do cenário s (mesma ordem de decompose), a coluna correspondente no vetor global;
+    - solver_stochastic retorna um objeto Result com X (vetor global), F (lucro esperado com sinal negativo), G, H e CV do modelo completo, além de:
+        - X_scenarios: Lista com o vetor x de cada cenário (mesma ordem de decompose);
+        - profits: Lucro de cada cenário, shape (Ns,).
+      Caso o resolvedor não encontre solução viável, X, F, G, H, X_scenarios e profits são None e res.message contém o motivo.
+'''
+
+# Variáveis de decisão do primeiro estágio (compartilhadas por todos os cenários)
+FIRST_STAGE = ['u_bm', 'u_chg', 'u_dch']
+
+def stochastic_model(data: dict, scenarios: list[dict], probabilities: np.ndarray = None, delta: float = 0.2)-> tuple:
+
+    Ns = len(scenarios) # Quantidade de cenários
+    if probabilities is None:
+        probabilities = np.full(Ns, 1 / Ns) # Cenários equiprováveis
+    probabilities = np.asarray(probabilities, dtype = float)
+
+    # Colunas locais (vetor x de um cenário) de cada estágio
+    idx = variable_indices(data)
+    nvars = sum(v.size for v in idx.values())
+    first = np.sort(np.concatenate([idx[name].ravel() for name in FIRST_STAGE]))
+    second = np.setdiff1d(np.arange(nvars), first)
+    n_first = first.size
+    n_second = second.size
+    n_total = n_first + Ns * n_second # Quantidade de variáveis do modelo estocástico
+
+    # Variáveis reais: p_exp ... p_dl, as demais (u_exp ... u_dl) são inteiras
+    Nr = idx['p_dl'].max() + 1
+    integer_local = np.arange(nvars) >= Nr
+
+    c = np.zeros(n_total)
+    c0 = 0.0
+    A_ub, b_ub, A_eq, b_eq = [], [], [], []
+    ub = np.zeros(n_total)
+    lb = np.zeros(n_total)
+    integrality = np.zeros(n_total)
+    columns = []
+
+    for s, scenario in enumerate(scenarios):
+
+        data_s = apply_scenario(data, scenario, delta)
+
+        # Mapeamento das colunas locais do cenário s para o vetor global
+        cols = np.empty(nvars, dtype = int)
+        cols[first] = np.arange(n_first)
+        cols[second] = n_first + s * n_second + np.arange(n_second)
+        columns.append(cols)
+
+        # Modelo linear do cenário s com as colunas remapeadas
+        c_s, c0_s, A_ub_s, b_ub_s, A_eq_s, b_eq_s = linear_model(data_s)
+        np.add.at(c, cols, probabilities[s] * c_s)
+        c0 += probabilities[s] * c0_s
+
+        for A_s, b_s, A, b in [(A_ub_s, b_ub_s, A_ub, b_ub), (A_eq_s, b_eq_s, A_eq, b_eq)]:
+            A_s = A_s.tocoo()
+            A.append(sparse.csr_matrix((A_s.data, (A_s.row, cols[A_s.col])), shape = (A_s.shape[0], n_total)))
+            b.append(b_s)
+
+        # Limites das variáveis do cenário s
+        ub_s, lb_s = bounds(data_s)
+        ub[cols] = ub_s
+        lb[cols] = lb_s
+        integrality[cols] = integer_local
+
+    A_ub = sparse.vstack(A_ub, format = 'csr')
+    A_eq = sparse.vstack(A_eq, format = 'csr')
+    b_ub = np.concatenate(b_ub)
+    b_eq = np.concatenate(b_eq)
+
+    return c, c0, A_ub, b_ub, A_eq, b_eq, ub, lb, integrality, columns
+
+def solver_stochastic(data: dict, scenarios: list[dict], probabilities: np.ndarray = None, delta: float = 0.2, time_limit: float = None):
+
+    c, c0, A_ub, b_ub, A_eq, b_eq, ub, lb, integrality, columns = stochastic_model(data, scenarios, probabilities, delta)
+
+    constraints = [LinearConstraint(A_ub, - np.inf, b_ub), # Restrições de desigualdade
+                   LinearConstraint(A_eq, b_eq, b_eq)] # Restrições de igualdade
+
+    options = {'disp': False}
+    if time_limit is not None:
+        options['time_limit'] = time_limit
+
+    # Obtendo a solução (o milp minimiza, logo o lucro esperado entra com sinal negativo)
+    start_time = time.time()
+    sol = milp(- c, constraints = constraints, integrality = integrality, bounds = Bounds(lb, ub), options = options)
+    end_time = time.time()
+
+    res = Result()
+    res.success = sol.success
+    res.message = sol.message
+    res.start_time = start_time
+    res.end_time = end_time
+    res.exec_time = end_time - start_time
+    res.X_scenarios = None # Sem solução viável, como X e F
+    res.profits = None
+
+    if sol.x is not None:
+        x = sol.x.copy()
+        x[integrality == 1] = np.round(x[integrality == 1]) # Eliminando resíduos numéricos das variáveis binárias
+
+        G = A_ub @ x - b_ub
+        H = A_eq @ x - b_eq
+
+        res.X = x
+        res.F = np.array([- (c @ x + c0)]) # Lucro esperado, com o sinal dos demais otimizadores
+        res.G = G
+        res.H = H
+        res.CV = np.array([np.sum(np.maximum(G, 0)) + np.sum(np.abs(H))])
+        res.X_scenarios = [x[cols] for cols in columns]
+        res.profits = np.array([obj_function(x_s, apply_scenario(data, scenario, delta)) for scenario, x_s in zip(scenarios, res.X_scenarios)])
+
+    return res
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from generator_scenarios import import_scenarios_from_pickle
+    from vpp_initial_data import vpp_data
+    from pathlib import Path
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    cenarios = import_scenarios_from_pickle(path)
+
+    res = solver_stochastic(data, cenarios)
+
+    print(f'{res.message}\nTempo de execução: {res.exec_time:.3f} s\n')
+    if res.X is not None:
+        print(f'Lucro esperado: {- res.F[0]:.2f}')
+        print(f'Lucro por cenário: {np.round(res.profits, 2)}')
@@ -0,0 +1,245 @@
+from vpp_initial_data import vpp_data
+from generator_scenarios import import_scenarios_from_pickle, apply_scenario
+from vpp_layout import get_layout
+from decompose_vetor import decompose, decompose_batch
+from objetive_function import obj_function, obj_function_batch
+from ieq_constraints import ieq_constr, ieq_constr_batch
+from eq_constraints import eq_constr
+from linear_model import linear_model
+from get_limits import bounds
+from ga_repair import VPPRepair
+from optimazer_MILP import solver_milp
+from stochastic_model import solver_stochastic, FIRST_STAGE
+from types import SimpleNamespace
+from pathlib import Path
+import numpy as np
+import pytest
+
+'''
+    Testes de regressão dos módulos de despacho da VPP: versões vetorizadas (população inteira) em relação às versões escalares de referência, modelo linear, limites das variáveis, reparo do GA e otimizadores.
+
+    - Execução: python -m pytest VPP_DISPATCH_MILP/test.py
+'''
+
+# Dados de um cenário de 24 h da VPP
+def scenario_data(k: int = 1)-> dict:
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    return apply_scenario(data, import_scenarios_from_pickle(path)[k])
+
+# População aleatória entre os limites, com as variáveis inteiras contínuas em [0, 1] (como no GA)
+def random_population(data: dict, n_pop: int = 20, seed: int = 0)-> np.ndarray:
+
+    ub, lb = bounds(data, cache = False)
+    rng = np.random.default_rng(seed)
+    return lb + rng.random((n_pop, lb.size)) * (ub - lb)
+
+def binarized(X: np.ndarray, data: dict)-> np.ndarray:
+
+    Nr = get_layout(data).Nr
+    Xb = X.copy()
+    Xb[:, Nr:] = Xb[:, Nr:] > 0.5
+    return Xb
+
+@pytest.fixture
+def data():
+    return scenario_data()
+
+# Função objetivo da população igual à escalar de cada indivíduo
+def test_obj_function_batch(data):
+
+    X = random_population(data)
+    F = obj_function_batch(X, data)
+
+    assert F.shape == (X.shape[0],)
+    np.testing.assert_allclose(F, [obj_function(x, data) for x in X], rtol = 1e-12)
+
+# Bloco das UBTMs igual a ieq_constr e G completo igual ao modelo linear
+def test_ieq_constr_batch(data):
+
+    layout = get_layout(data)
+    X = random_population(data)
+    c, c0, A_ub, b_ub, A_eq, b_eq = linear_model(data)
+
+    G_bm = ieq_constr_batch(X, data, blocks = ('bm',))
+    np.testing.assert_allclose(G_bm, [ieq_constr(x, data) for x in X], rtol = 1e-12, atol = 1e-9)
+
+    G = ieq_constr_batch(X, data)
+    assert G.shape == (X.shape[0], layout.n_ieq)
+    np.testing.assert_allclose(G, binarized(X, data) @ A_ub.T - b_ub, rtol = 1e-12, atol = 1e-9)
+
+    # Os blocos selecionados são as colunas correspondentes do G completo
+    rows = layout.ieq_rows
+    G_sel = ieq_constr_batch(X, data, blocks = ('imp', 'bat'))
+    np.testing.assert_allclose(G_sel, np.hstack((G[:, rows['imp']], G[:, rows['bat']])))
+
+# Modelo linear igual a obj_function e eq_constr (também com os estados iniciais opcionais)
+@pytest.mark.parametrize('initial_state', [False, True])
+def test_linear_model(data, initial_state):
+
+    if initial_state:
+        data['u_bm_0'] = np.array([1, 0, 1])
+        data['soc_0'] = np.full(data['Nbat'], 0.5)
+
+    c, c0, A_ub, b_ub, A_eq, b_eq = linear_model(data)
+    for x in binarized(random_population(data, n_pop = 5), data):
+        np.testing.assert_allclose(c @ x + c0, obj_function(x, data), rtol = 1e-12)
+        np.testing.assert_allclose(A_eq @ x - b_eq, eq_constr(x, data), atol = 1e-9)
+
+# Variáveis decompostas são views somente leitura, sem alterar o array do chamador
+def test_decompose_read_only(data):
+
+    layout = get_layout(data)
+    X = random_population(data, n_pop = 3)
+    x = X[0].copy()
+
+    variables = decompose(x, data)
+    assert x.flags.writeable
+    assert np.shares_memory(variables[0], x)
+    for name, var in zip(layout.slices, variables):
+        assert var.shape == layout.shapes[name]
+        assert not var.flags.writeable
+        with pytest.raises(ValueError):
+            var[...] = 0
+
+    # Inteiras binarizadas em {0, 1} e views de x quando x já é binário
+    assert set(np.unique(np.concatenate([var.ravel() for var in variables[8:]]))) <= {0.0, 1.0}
+    xb = binarized(X, data)[0]
+    assert np.shares_memory(decompose(xb, data, binarize = False)[-1], xb)
+
+    batch = decompose_batch(X, data)
+    for k in range(X.shape[0]):
+        for var_batch, var in zip(batch, decompose(X[k], data)):
+            np.testing.assert_array_equal(var_batch[k], var)
+    assert all(not var.flags.writeable for var in batch)
+
+# Limites na ordem i-major do vetor x (o limite de cada ativo repetido nos Nt instantes) e cache que retorna cópias
+def test_bounds_order(data):
+
+    # Limites distintos por ativo, de modo que a ordem t-major não coincida com a i-major
+    data['p_bm_max'] = np.array([0.5, 0.6, 0.7])
+    data['p_bm_min'] = np.array([0.1, 0.15, 0.2])
+    data['p_bat_max'] = np.array([0.1, 0.2])
+    data['soc_max'] = np.array([0.75, 0.8])
+    data['soc_min'] = np.array([0.5, 0.45])
+
+    layout = get_layout(data)
+    ub, lb = bounds(data, cache = False)
+
+    def block(v: np.ndarray, name: str)-> np.ndarray:
+        return v[layout.slices[name]].reshape(layout.shapes[name])
+
+    shape = (layout.Nbm, layout.Nt)
+    np.testing.assert_array_equal(block(ub, 'p_bm'), np.broadcast_to(data['p_bm_max'][:, None], shape))
+    np.testing.assert_array_equal(block(lb, 'p_bm'), np.broadcast_to(data['p_bm_min'][:, None], shape))
+    np.testing.assert_array_equal(block(ub, 'gamma_bm'), np.broadcast_to((data['p_bm_max'] * data['kappa_bm'])[:, None], shape))
+    shape = (layout.Nbat, layout.Nt)
+    for name in ['p_chg', 'p_dch']:
+        np.testing.assert_array_equal(block(ub, name), np.broadcast_to(data['p_bat_max'][:, None], shape))
+    np.testing.assert_array_equal(block(ub, 'soc'), np.broadcast_to(data['soc_max'][:, None], shape))
+    np.testing.assert_array_equal(block(lb, 'soc'), np.broadcast_to(data['soc_min'][:, None], shape))
+    np.testing.assert_array_equal(block(ub, 'p_dl'), data['p_dl_max'])
+    np.testing.assert_array_equal(block(lb, 'p_dl'), data['p_dl_min'])
+    np.testing.assert_array_equal(ub[layout.Nr:], 1.0)
+    np.testing.assert_array_equal(lb[layout.Nr:], 0.0)
+
+    # Rampa em relação a p_bm_0 somente no primeiro instante de cada UBTM
+    data['p_bm_0'] = np.zeros(layout.Nbm)
+    ub_0, lb_0 = bounds(data, cache = False)
+    np.testing.assert_array_equal(block(ub_0, 'p_bm')[:, 0], np.minimum(data['p_bm_max'], data['p_bm_rup']))
+    np.testing.assert_array_equal(block(ub_0, 'p_bm')[:, 1:], block(ub, 'p_bm')[:, 1:])
+
+    # O cache retorna cópias: alterar o resultado não altera as chamadas seguintes
+    ub_1, lb_1 = bounds(data)
+    ub_1[:] = -1
+    np.testing.assert_array_equal(bounds(data)[0], ub_0)
+
+# Indivíduos reparados dentro dos limites e respeitando a física da VPP
+@pytest.mark.parametrize('initial_soc', [False, True])
+def test_repair(data, initial_soc):
+
+    if initial_soc:
+        data['soc_0'] = np.full(data['Nbat'], 0.5)
+    # Com o custo de partida padrão, kappa_bm * p_bm + kappa_bm_start excede o limite superior de gamma_bm, portanto a restrição de custo não é reparável
+    data['kappa_bm_start'] = np.zeros(data['Nbm'])
+
+    layout = get_layout(data)
+    ub, lb = bounds(data, cache = False)
+    X = random_population(data, n_pop = 50, seed = 1)
+    X = VPPRepair(data, layout)._do(SimpleNamespace(xl = lb, xu = ub), X)
+
+    assert np.all(X >= lb - 1e-12) and np.all(X <= ub + 1e-12)
+    assert np.all(np.isin(X[:, layout.Nr:], [0.0, 1.0]))
+
+    for x in X:
+        p_exp, p_imp, p_bm, gamma_bm, p_chg, p_dch, soc, p_dl, u_exp, u_imp, u_bm, u_chg, u_dch, u_dl = decompose(x, data)
+        assert np.all(u_exp + u_imp == 1)
+        assert np.all(u_chg + u_dch <= 1)
+        assert np.all(p_chg <= data['p_bat_max'][:, None] * u_chg + 1e-12)
+        assert np.all(p_dch <= data['p_bat_max'][:, None] * u_dch + 1e-12)
+
+        # Simultaneidade e estado de carga satisfeitos (o balanço de potência não é reparado)
+        H = eq_constr(x, data)
+        np.testing.assert_allclose(H[layout.eq_rows['simul']], 0.0)
+        np.testing.assert_allclose(H[layout.eq_rows['soc']], 0.0, atol = 1e-9)
+
+    # Custo e limites das UBTMs (as rampas não são reparadas)
+    G = ieq_constr_batch(X, data, blocks = ('bm',))
+    assert np.all(G[:, : 3 * layout.Nbm * layout.Nt] <= 1e-9)
+
+# Solução do MILP dentro dos limites, factível no modelo linear, com binários em {0, 1} e lucro igual ao de obj_function
+def test_solver_milp(data):
+
+    data['kappa_bm_start'] = np.zeros(data['Nbm'])
+
+    layout = get_layout(data)
+    ub, lb = bounds(data)
+    c, c0, A_ub, b_ub, A_eq, b_eq = linear_model(data)
+    res = solver_milp(data)
+
+    assert res.X is not None
+    assert np.all(res.X >= lb - 1e-7) and np.all(res.X <= ub + 1e-7)
+    assert np.all(np.isin(res.X[layout.Nr:], [0.0, 1.0]))
+    np.testing.assert_allclose(A_eq @ res.X, b_eq, atol = 1e-6)
+    assert np.all(A_ub @ res.X <= b_ub + 1e-6)
+    np.testing.assert_allclose(res.F, - obj_function(res.X, data), rtol = 1e-12)
+
+# Com o custo de partida padrão o HiGHS prova a infactibilidade: sem solução, X e F são None (verificado por script, batch_dispatch e rolling_horizon)
+def test_solver_milp_infeasible(data):
+
+    res = solver_milp(data)
+
+    assert not res.success
+    assert res.X is None and res.F is None
+
+# Despacho estocástico: decisões do primeiro estágio (u_bm, u_chg, u_dch) iguais em todos os cenários
+def test_solver_stochastic(data):
+
+    data['kappa_bm_start'] = np.zeros(data['Nbm'])
+
+    layout = get_layout(data)
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    scenarios = import_scenarios_from_pickle(path)[: 3]
+    res = solver_stochastic(data, scenarios)
+
+    assert res.X is not None
+    assert len(res.X_scenarios) == len(scenarios) and res.profits.shape == (len(scenarios),)
+    for name in FIRST_STAGE:
+        first = [x_s[layout.slices[name]] for x_s in res.X_scenarios]
+        for x_first in first[1:]:
+            np.testing.assert_array_equal(x_first, first[0])
+
+    # Lucro esperado (cenários equiprováveis) igual à média dos lucros de cada cenário
+    np.testing.assert_allclose(- res.F[0], np.mean(res.profits), rtol = 1e-9)
+
+# Sem solução viável (custo de partida padrão), X_scenarios e profits são None, como X e F
+def test_solver_stochastic_infeasible(data):
+
+    path = Path(__file__).parent / 'scenarios_with_PVGIS.pkl'
+    res = solver_stochastic(data, import_scenarios_from_pickle(path)[: 2])
+
+    assert res.X is None and res.F is None
+    assert res.X_scenarios is None and res.profits is None
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
+
+'''
+    Este script tem a finalidade de definir, uma única vez por dimensão da VPP, o leiaute do vetor de variáveis de decisão (x) e das restrições, compartilhado por decompose, obj_function, eq_constr, ieq_constr, bounds e pelos otimizadores.
+
+    - get_layout(data) retorna o VPPLayout de (Nt, Nbm, Nbat, Ndl), memoizado: dicionários data com as mesmas dimensões compartilham o mesmo objeto;
+    - VPPLayout é imutável (__slots__ e sem atribuição após a criação) e contém:
+        - Nt, Nbm, Nbat, Ndl: Dimensões da VPP;
+        - Nr, Ni, n_var: Quantidade de variáveis reais (p_exp ... p_dl), inteiras (u_exp ... u_dl) e total;
+        - slices, shapes: Fatia no vetor x e formato de cada variável de VARIABLES, ex.: x[layout.slices['p_bm']].reshape(layout.shapes['p_bm']);
+        - real_blocks, int_blocks: Tuplas (fatia, shape) das variáveis reais em x e das inteiras em x[Nr:], na ordem de VARIABLES (usadas por decompose sem consultas a dicionários);
+        - eq_rows, n_eq: Fatia de cada bloco de restrições de igualdade (pwr_blc, simul, soc), na ordem de eq_constr, e total;
+        - ieq_rows, n_ieq: Fatia de cada bloco de restrições de desigualdade (imp, exp, bm, bat, dl), na ordem de ieq_constr, e total.
+'''
+
+# Variáveis de decisão na ordem em que aparecem no vetor x
+VARIABLES = ['p_exp', 'p_imp', 'p_bm', 'gamma_bm', 'p_chg', 'p_dch', 'soc', 'p_dl', 'u_exp', 'u_imp', 'u_bm', 'u_chg', 'u_dch', 'u_dl']
+N_REAL = 8 # Quantidade de variáveis reais (p_exp ... p_dl)
+
+# Fatias consecutivas a partir da quantidade de elementos de cada bloco
+def _slices(sizes: dict)-> dict[str, slice]:
+
+    slices = {}
+    begin = 0
+    for name, size in sizes.items():
+        slices[name] = slice(begin, begin + size)
+        begin += size
+
+    return slices
+
+class VPPLayout:
+
+    __slots__ = ('Nt', 'Nbm', 'Nbat', 'Ndl', 'Nr', 'Ni', 'n_var', 'slices', 'shapes', 'real_blocks', 'int_blocks', 'eq_rows', 'n_eq', 'ieq_rows', 'n_ieq')
+
+    def __init__(self, Nt: int, Nbm: int, Nbat: int, Ndl: int):
+
+        # Formato de cada variável de decisão na ordem em que aparece no vetor x
+        shapes = dict(zip(VARIABLES, [(Nt,), (Nt,), (Nbm, Nt), (Nbm, Nt), (Nbat, Nt), (Nbat, Nt), (Nbat, Nt), (Ndl, Nt), # Variáveis reais
+                                      (Nt,), (Nt,), (Nbm, Nt), (Nbat, Nt), (Nbat, Nt), (Ndl, Nt)])) # Variáveis inteiras
+        slices = _slices({name: int(np.prod(shape)) for name, shape in shapes.items()})
+
+        # Restrições de igualdade: balanço de potência, simultaneidade e estado de carga
+        eq_rows = _slices({'pwr_blc': Nt, 'simul': Nt, 'soc': Nbat * Nt})
+
+        # Restrições de desigualdade: importação, exportação, UBTMs (custo, mínimo, máximo, rampas), armazenadores e cargas despacháveis
+        ieq_rows = _slices({'imp': Nt, 'exp': Nt, 'bm': 3 * Nbm * Nt + 2 * Nbm * (Nt - 1), 'bat': 3 * Nbat * Nt, 'dl': 2 * Ndl * Nt})
+
+        # (fatia, shape) de cada variável real em x e de cada variável inteira em x[Nr:], na ordem de VARIABLES
+        Nr = slices[VARIABLES[N_REAL - 1]].stop
+        real_blocks = tuple((slices[name], shapes[name]) for name in VARIABLES[: N_REAL])
+        int_blocks = tuple((slice(slices[name].start - Nr, slices[name].stop - Nr), shapes[name]) for name in VARIABLES[N_REAL:])
+
+        set_slot = super().__setattr__
+        for name, value in [('Nt', Nt), ('Nbm', Nbm), ('Nbat', Nbat), ('Ndl', Ndl),
+                            ('Nr', Nr), ('n_var', slices[VARIABLES[-1]].stop),
+                            ('slices', MappingProxyType(slices)), ('shapes', MappingProxyType(shapes)),
+                            ('real_blocks', real_blocks), ('int_blocks', int_blocks),
+                            ('eq_rows', MappingProxyType(eq_rows)), ('n_eq', eq_rows['soc'].stop),
+                            ('ieq_rows', MappingProxyType(ieq_rows)), ('n_ieq', ieq_rows['dl'].stop)]:
+            set_slot(name, value)
+        set_slot('Ni', self.n_var - self.Nr)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('VPPLayout é imutável')
+
+    def __delattr__(self, name):
+        raise AttributeError('VPPLayout é imutável')
+
+    # Serialização (ex.: envio aos processos de um pool) pelas dimensões, reconstruindo pelo cache
+    def __reduce__(self):
+        return vpp_layout, (self.Nt, self.Nbm, self.Nbat, self.Ndl)
+
+    def __repr__(self):
+        return f'VPPLayout(Nt={self.Nt}, Nbm={self.Nbm}, Nbat={self.Nbat}, Ndl={self.Ndl}, Nr={self.Nr}, Ni={self.Ni})'
+
+    # Índices (colunas) de cada variável de decisão no vetor x, com o formato da variável
+    def indices(self)-> dict[str, np.ndarray]:
+        return {name: np.arange(self.slices[name].start, self.slices[name].stop).reshape(shape) for name, shape in self.shapes.items()}
+
+@lru_cache(maxsize = 64)
+def vpp_layout(Nt: int, Nbm: int, Nbat: int, Ndl: int)-> VPPLayout:
+    return VPPLayout(Nt, Nbm, Nbat, Ndl)
+
+def get_layout(data: dict)-> VPPLayout:
+    return vpp_layout(int(data['Nt']), int(data['Nbm']), int(data['Nbat']), int(data['Ndl']))
+
+# Exemplo de uso
+if __name__ == '__main__':
+
+    from vpp_initial_data import vpp_data
+    import pickle
+
+    data = vpp_data()
+    data['Nt'] = 24
+
+    layout = get_layout(data)
+    print(layout)
+    print(f"Variáveis: {layout.n_var}, restrições de igualdade: {layout.n_eq}, de desigualdade: {layout.n_ieq}")
+    for name in VARIABLES:
+        print(f'{name}: x[{layout.slices[name].start}: {layout.slices[name].stop}], shape {layout.shapes[name]}')
+
+    # O mesmo objeto para as mesmas dimensões, inclusive após a serialização
+    print(get_layout(dict(data)) is layout, pickle.loads(pickle.dumps(layout)) is layout)